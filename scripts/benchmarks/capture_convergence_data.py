@@ -4,22 +4,92 @@ Capture real convergence data by running experiments with the current fitness mu
 """
 
 import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
 from src.utils.data_generator import DataGenerator
-from src.ga.simple_engine import create_initial_population, calculate_fitness
-from src.models import Solution
+from src.ga.simple_engine import (
+    create_initial_population, calculate_fitness,
+    simple_crossover, simple_mutation
+)
+from src.models import VMArrays
 import random
 from typing import List
 
+
+# Scenario shared by every child of a run, set once per process
+_scenario = {}
+
+
+def _init_scenario(vms):
+    """Pool initializer: keep the run's VMs in this process."""
+    _scenario['vm_arrays'] = VMArrays.from_vms(vms)
+
+
+def _make_child(parent1, parent2, mutate, seed):
+    """
+    Build one offspring: crossover, mutation and fitness.
+
+    Whether to mutate is decided up front by the caller. Runs inside a pool
+    worker, so it is seeded explicitly to keep runs reproducible regardless
+    of which worker picks up the task. The operators draw from the global
+    RNG, so its state is restored afterwards for when this runs in-process.
+    The scenario comes from _init_scenario rather than being sent with every
+    task.
+    """
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        child = simple_crossover(parent1, parent2, _scenario['vm_arrays'])
+        if mutate:
+            child = simple_mutation(child, mutation_rate=1.0)
+    finally:
+        random.setstate(state)
+    # No repair pass: crossover and mutation only place VMs through
+    # capacity checks and keep every VM, so children are always valid
+    calculate_fitness(child)
+    return child
+
+
+def _elite_indices(fitnesses, count):
+    """Indices of the `count` lowest fitness values, best first."""
+    count = min(count, len(fitnesses))
+    if count <= 0:
+        return []
+    candidates = np.argpartition(fitnesses, count - 1)[:count]
+    return candidates[np.argsort(fitnesses[candidates], kind='stable')]
+
+
+def _dumps_results(obj, level=0, indent=2):
+    """
+    JSON text with dicts indented but lists written compactly on one line,
+    so the long convergence arrays don't get one line per value.
+    """
+    if isinstance(obj, dict) and obj:
+        pad = ' ' * (indent * (level + 1))
+        items = [f"{pad}{json.dumps(str(key))}: {_dumps_results(value, level + 1, indent)}"
+                 for key, value in obj.items()]
+        return '{\n' + ',\n'.join(items) + '\n' + ' ' * (indent * level) + '}'
+    return json.dumps(obj, separators=(',', ':'))
+
+
 def run_ga_with_tracking(vms, server_template, population_size=50, generations=100,
-                         elitism_count=2, mutation_rate=0.3, initial_quality="random"):
+                         elitism_count=2, mutation_rate=0.3, initial_quality="random",
+                         seed=None, max_workers=1):
     """
     Run GA and track convergence data.
+
+    Offspring are built in-process by default. With max_workers > 1 (None
+    for one per CPU) they are built on a process pool started once for the
+    whole run; every task pickles both parents and the child, which costs
+    about as much as building the child, so the pool is opt-in.
+    Without a seed, the run's random stream is drawn from the global RNG, so
+    seeding `random` (as DataGenerator.generate_scenario does) still makes
+    the run reproducible.
     """
-    from src.ga.simple_engine import (
-        tournament_selection, crossover, mutate_solution,
-        consolidate_servers_mutation, simple_move_mutation,
-        validate_and_fix_solution
-    )
 
     print(f"\n--- Tracking GA Convergence ---")
     print(f"Problem: {len(vms)} VMs, {population_size} population, {generations} generations")
@@ -45,77 +115,101 @@ def run_ga_with_tracking(vms, server_template, population_size=50, generations=1
     best_ever_servers = float('inf')
     stagnation = 0
 
-    for gen in range(generations):
-        # Sort by fitness
-        population.sort(key=lambda s: s.fitness)
-
-        best_fitness = population[0].fitness
-        best_servers = population[0].num_servers_used
-        worst_fitness = population[-1].fitness
-        avg_fitness = sum(s.fitness for s in population) / len(population)
-        avg_servers = sum(s.num_servers_used for s in population) / len(population)
-
-        # Store convergence data
-        convergence_history['best_fitness'].append(round(best_fitness, 2))
-        convergence_history['avg_fitness'].append(round(avg_fitness, 2))
-        convergence_history['worst_fitness'].append(round(worst_fitness, 2))
-        convergence_history['best_servers'].append(best_servers)
-        convergence_history['avg_servers'].append(round(avg_servers, 1))
-
-        # Track improvements
-        improved = False
-        if best_servers < best_ever_servers:
-            best_ever_servers = best_servers
-            improved = True
-            stagnation = 0
-            print(f"  *** NEW BEST: {best_servers} servers! ***")
-        elif best_fitness < best_ever_fitness:
-            best_ever_fitness = best_fitness
-            improved = True
-            stagnation = 0
-        else:
-            stagnation += 1
-
-        # Print progress
-        print(f"Gen {gen+1:3d}: Best={best_fitness:6.2f} ({best_servers}s), "
-              f"Avg={avg_fitness:6.2f}, Worst={worst_fitness:6.2f}, "
-              f"Stag={stagnation}")
-
-        # Early stopping
-        if stagnation >= 40:
-            print(f"\nStopping early after {stagnation} generations without improvement\n")
-            break
-
-        # Evolution
-        new_population = []
-
-        # Elitism
-        for i in range(elitism_count):
-            new_population.append(population[i].clone())
-
-        # Generate offspring
-        while len(new_population) < population_size:
-            parent1 = tournament_selection(population, k=3)
-            parent2 = tournament_selection(population, k=3)
-
-            child = crossover(parent1, parent2, server_template)
-
-            # Mutation
-            if random.random() < mutation_rate:
-                if random.random() < 0.6:  # 60% consolidation
-                    child = consolidate_servers_mutation(child, server_template)
-                else:
-                    child = simple_move_mutation(child, server_template)
-
-            child = validate_and_fix_solution(child, list(vms), server_template)
-            calculate_fitness(child)
-            new_population.append(child)
-
-        population = new_population
+    # An optional pool is started once, outside the generation loop
+    if seed is None:
+        seed = random.getrandbits(64)
+    rng = np.random.default_rng(seed)
+    max_workers = max_workers or os.cpu_count()
+    if max_workers > 1:
+        # spawn: forking after Numba has started its threads is unsafe
+        executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_scenario,
+                                       initargs=(vms,),
+                                       mp_context=multiprocessing.get_context('spawn'))
+    else:
+        executor = None
+        _init_scenario(vms)
+
+    try:
+        for gen in range(generations):
+            # Single pass over fitness values; no full sort is needed for
+            # the stats or for picking the elites
+            fitnesses = np.fromiter((s.fitness for s in population),
+                                    dtype=np.float64, count=len(population))
+            best = population[int(fitnesses.argmin())]
+
+            best_fitness = best.fitness
+            best_servers = best.num_servers_used
+            worst_fitness = float(fitnesses.max())
+            avg_fitness = float(fitnesses.mean())
+            avg_servers = sum(s.num_servers_used for s in population) / len(population)
+
+            # Store convergence data
+            convergence_history['best_fitness'].append(round(best_fitness, 2))
+            convergence_history['avg_fitness'].append(round(avg_fitness, 2))
+            convergence_history['worst_fitness'].append(round(worst_fitness, 2))
+            convergence_history['best_servers'].append(best_servers)
+            convergence_history['avg_servers'].append(round(avg_servers, 1))
+
+            # Track improvements
+            improved = False
+            if best_servers < best_ever_servers:
+                best_ever_servers = best_servers
+                improved = True
+                stagnation = 0
+                print(f"  *** NEW BEST: {best_servers} servers! ***")
+            elif best_fitness < best_ever_fitness:
+                best_ever_fitness = best_fitness
+                improved = True
+                stagnation = 0
+            else:
+                stagnation += 1
+
+            # Print progress
+            print(f"Gen {gen+1:3d}: Best={best_fitness:6.2f} ({best_servers}s), "
+                  f"Avg={avg_fitness:6.2f}, Worst={worst_fitness:6.2f}, "
+                  f"Stag={stagnation}")
+
+            # Early stopping
+            if stagnation >= 40:
+                print(f"\nStopping early after {stagnation} generations without improvement\n")
+                break
+
+            # Evolution
+            new_population = []
+
+            # Elitism (no copy needed: operators clone before modifying)
+            for i in _elite_indices(fitnesses, elitism_count):
+                new_population.append(population[i])
+
+            # Generate offspring: all random decisions for the generation are
+            # drawn here in bulk, children are built by the workers, each with
+            # its own seed. Tournaments (k=3) draw contestants without
+            # replacement and the lowest fitness wins.
+            num_children = population_size - len(new_population)
+            contestants = rng.random((num_children, 2, len(population))).argpartition(
+                2, axis=-1)[..., :3]
+            winners = np.take_along_axis(
+                contestants, fitnesses[contestants].argmin(axis=-1)[..., None], axis=-1)[..., 0]
+            mutate = rng.random(num_children) < mutation_rate
+            seeds = rng.integers(2**32, size=num_children).tolist()
+
+            parents1 = [population[i] for i in winners[:, 0]]
+            parents2 = [population[i] for i in winners[:, 1]]
+            child_args = (parents1, parents2, mutate.tolist(), seeds)
+            if executor:
+                chunksize = max(1, num_children // max_workers)
+                new_population.extend(executor.map(_make_child, *child_args,
+                                                   chunksize=chunksize))
+            else:
+                new_population.extend(map(_make_child, *child_args))
+
+            population = new_population
+    finally:
+        if executor:
+            executor.shutdown()
 
     # Return best solution and convergence history
-    population.sort(key=lambda s: s.fitness)
-    return population[0], convergence_history
+    return min(population, key=lambda s: s.fitness), convergence_history
 
 
 def main():
@@ -175,7 +269,7 @@ def main():
     # Save to JSON
     output_file = 'results/convergence/convergence_data.json'
     with open(output_file, 'w') as f:
-        json.dump(all_results, f, indent=2)
+        f.write(_dumps_results(all_results))
 
     print("\n" + "=" * 70)
     print("✅ CONVERGENCE DATA CAPTURED")
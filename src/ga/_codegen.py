@@ -0,0 +1,92 @@
+"""
+Runtime-specialized fitness helpers.
+
+Every scenario packs into servers built from one template, so the server
+capacities are fixed for the whole run. The per-solution validity and
+utilization pass is generated with `exec` for each capacity, with the
+capacities bound as globals of the generated code instead of being read
+from every server.
+"""
+
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+
+from ..models.solution import Solution
+
+# Returned by a generated function when a server has a different capacity
+_MIXED = object()
+
+_TEMPLATE = '''
+def solution_stats(servers):
+    num_used = 0
+    cpu = ram = storage = 0.0
+    for server in servers:
+        if server._capacity_class != {capacity_class}:
+            return MIXED
+        if not server.vms:
+            continue
+        used_cpu = server._used_cpu
+        used_ram = server._used_ram
+        used_storage = server._used_storage
+        if used_cpu > CAP_CPU or used_ram > CAP_RAM or used_storage > CAP_STORAGE:
+            return None
+        num_used += 1
+        cpu += {util_cpu}
+        ram += {util_ram}
+        storage += {util_storage}
+    if not num_used:
+        return 0, 0.0, 0.0, 0.0
+    return num_used, cpu / num_used, ram / num_used, storage / num_used
+'''
+
+
+def _utilization_expr(used: str, cap_name: str, cap: float) -> str:
+    """Same formula as Server.utilization_*, with the zero-capacity branch resolved."""
+    return f"({used} / {cap_name}) * 100" if cap > 0 else "0"
+
+
+@lru_cache(maxsize=None)
+def make_solution_stats(cap_cpu: float, cap_ram: float, cap_storage: float,
+                        capacity_class: int) -> Callable:
+    """
+    Generate the stats pass for servers of one capacity.
+
+    The generated function takes a list of servers and returns
+    (num_servers_used, avg_cpu, avg_ram, avg_storage) utilization, None if
+    any server is over capacity, or a sentinel if a server has a different
+    capacity.
+    """
+    src = _TEMPLATE.format(
+        capacity_class=capacity_class,
+        util_cpu=_utilization_expr('used_cpu', 'CAP_CPU', cap_cpu),
+        util_ram=_utilization_expr('used_ram', 'CAP_RAM', cap_ram),
+        util_storage=_utilization_expr('used_storage', 'CAP_STORAGE', cap_storage),
+    )
+    # Capacities are bound by name rather than written into the source as
+    # literals, so values without a parseable repr (inf, NumPy scalars) work
+    namespace = {'MIXED': _MIXED, 'CAP_CPU': cap_cpu, 'CAP_RAM': cap_ram,
+                 'CAP_STORAGE': cap_storage}
+    exec(compile(src, f"<solution_stats {cap_cpu}/{cap_ram}/{cap_storage}>", 'exec'), namespace)
+    return namespace['solution_stats']
+
+
+def solution_stats(solution: Solution) -> Optional[Tuple[int, float, float, float]]:
+    """
+    Validity and average utilization of a solution in one pass.
+
+    Returns:
+        (num_servers_used, avg_cpu, avg_ram, avg_storage) utilization in
+        percent, or None if the solution is invalid
+    """
+    if solution.servers:
+        first = solution.servers[0]
+        stats = make_solution_stats(first.max_cpu_cores, first.max_ram_gb,
+                                    first.max_storage_gb, first._capacity_class)(solution.servers)
+        if stats is not _MIXED:
+            return stats
+
+    # Empty solution or servers of mixed capacity: use the generic path
+    if not solution.is_valid():
+        return None
+    utils = solution.average_utilization
+    return solution.num_servers_used, utils['cpu'], utils['ram'], utils['storage']
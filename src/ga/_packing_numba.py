@@ -0,0 +1,191 @@
+"""
+Compiled packing and scoring kernels.
+
+The kernels work on the array representation (a (num_vms, 3) demand matrix
+and a (cpu, ram, storage) capacity vector) and are compiled with Numba when
+it is installed. Numba is optional: without it `njit` is a no-op, and
+callers check HAS_NUMBA to keep their object-based path instead of running
+these loops as slow pure Python.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves the function as is."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# Placement rules for pack
+FIRST_FIT, BEST_FIT, WORST_FIT = 0, 1, 2
+
+
+@njit(cache=True, nogil=True)
+def pack(demand, capacity, mode):
+    """
+    Pack VMs, in order, into identical servers with a First-, Best- or
+    Worst-Fit rule.
+
+    Uses the same check as Server.can_fit (free capacity >= demand), the
+    same remaining-capacity score as the Python packers and usage
+    accumulated in the same order, so it places VMs exactly like them.
+
+    Returns:
+        (assignment, num_servers): server index per VM (-1 if a VM does not
+        fit even an empty server) and the number of servers opened
+    """
+    num_vms = demand.shape[0]
+    used = np.zeros((num_vms, 3))
+    assignment = np.full(num_vms, -1, dtype=np.int64)
+    num_servers = 0
+
+    for v in range(num_vms):
+        cpu, ram, storage = demand[v, 0], demand[v, 1], demand[v, 2]
+        target = -1
+        best_remaining = np.inf if mode == BEST_FIT else -1.0
+        for s in range(num_servers):
+            free_cpu = capacity[0] - used[s, 0]
+            free_ram = capacity[1] - used[s, 1]
+            free_storage = capacity[2] - used[s, 2]
+            if free_cpu >= cpu and free_ram >= ram and free_storage >= storage:
+                if mode == FIRST_FIT:
+                    target = s
+                    break
+                remaining = free_cpu - cpu + (free_ram - ram) / 10 + (free_storage - storage) / 100
+                if remaining < best_remaining if mode == BEST_FIT else remaining > best_remaining:
+                    best_remaining = remaining
+                    target = s
+                    if mode == BEST_FIT and remaining <= 0.0:
+                        break
+        if target < 0:
+            if capacity[0] >= cpu and capacity[1] >= ram and capacity[2] >= storage:
+                target = num_servers
+                num_servers += 1
+            else:
+                continue
+        used[target, 0] += cpu
+        used[target, 1] += ram
+        used[target, 2] += storage
+        assignment[v] = target
+
+    return assignment, num_servers
+
+
+@njit(parallel=True, cache=True)
+def population_fitness(used, offsets, capacity, invalid_penalty):
+    """
+    SimpleFitnessEvaluator fitness of a whole population, in parallel.
+
+    Args:
+        used: (num_servers, 3) used (cpu, ram, storage) of the non-empty
+            servers of every solution, stacked solution after solution
+        offsets: Start of each solution's rows in `used`, plus the total
+        capacity: (cpu, ram, storage) capacity shared by all servers
+        invalid_penalty: Fitness of a solution with a server over capacity
+
+    Returns:
+        Fitness per solution, computed in the same order of operations as
+        SimpleFitnessEvaluator.evaluate
+    """
+    num_solutions = offsets.shape[0] - 1
+    fitness = np.empty(num_solutions)
+
+    for p in prange(num_solutions):
+        num_used = offsets[p + 1] - offsets[p]
+        cpu = ram = storage = 0.0
+        valid = True
+        for s in range(offsets[p], offsets[p + 1]):
+            if used[s, 0] > capacity[0] or used[s, 1] > capacity[1] or used[s, 2] > capacity[2]:
+                valid = False
+                break
+            if capacity[0] > 0:
+                cpu += (used[s, 0] / capacity[0]) * 100
+            if capacity[1] > 0:
+                ram += (used[s, 1] / capacity[1]) * 100
+            if capacity[2] > 0:
+                storage += (used[s, 2] / capacity[2]) * 100
+
+        if not valid:
+            fitness[p] = invalid_penalty
+        elif num_used == 0:
+            fitness[p] = 0.0
+        else:
+            cpu /= num_used
+            ram /= num_used
+            storage /= num_used
+            avg_util = (cpu + ram + storage) / 3.0
+            util_variance = ((cpu - avg_util) ** 2 + (ram - avg_util) ** 2 +
+                             (storage - avg_util) ** 2) / 3.0
+            fitness[p] = num_used * 100.0 + (100.0 - avg_util) + util_variance * 0.1
+
+    return fitness
+
+
+@njit(cache=True)
+def repair_first_fit(server_of, num_servers, demand, capacity):
+    """
+    Repair step of vectorized.repair_vec, compiled.
+
+    Servers over capacity keep their VMs greedily in index order; the VMs
+    they drop and the unassigned ones (server_of == -1) are then placed
+    First-Fit, opening new servers (numbered from num_servers) when nothing
+    fits. `server_of` is updated in place.
+
+    Returns:
+        (unplaced, num_servers): mask of the VMs that went through
+        First-Fit and the new number of servers
+    """
+    num_vms = server_of.shape[0]
+    used = np.zeros((num_servers + num_vms, 3))
+    unplaced = server_of == -1
+    for v in range(num_vms):
+        s = server_of[v]
+        if s >= 0:
+            used[s, 0] += demand[v, 0]
+            used[s, 1] += demand[v, 1]
+            used[s, 2] += demand[v, 2]
+
+    overflowing = np.zeros(num_servers, dtype=np.bool_)
+    for s in range(num_servers):
+        if used[s, 0] > capacity[0] or used[s, 1] > capacity[1] or used[s, 2] > capacity[2]:
+            overflowing[s] = True
+            used[s, 0] = used[s, 1] = used[s, 2] = 0.0
+    for v in range(num_vms):
+        s = server_of[v]
+        if s >= 0 and overflowing[s]:
+            if (capacity[0] - used[s, 0] >= demand[v, 0] and
+                    capacity[1] - used[s, 1] >= demand[v, 1] and
+                    capacity[2] - used[s, 2] >= demand[v, 2]):
+                used[s, 0] += demand[v, 0]
+                used[s, 1] += demand[v, 1]
+                used[s, 2] += demand[v, 2]
+            else:
+                unplaced[v] = True
+                server_of[v] = -1
+
+    for v in range(num_vms):
+        if not unplaced[v]:
+            continue
+        target = num_servers
+        for s in range(num_servers):
+            if (capacity[0] - used[s, 0] >= demand[v, 0] and
+                    capacity[1] - used[s, 1] >= demand[v, 1] and
+                    capacity[2] - used[s, 2] >= demand[v, 2]):
+                target = s
+                break
+        if target == num_servers:
+            num_servers += 1
+        used[target, 0] += demand[v, 0]
+        used[target, 1] += demand[v, 1]
+        used[target, 2] += demand[v, 2]
+        server_of[v] = target
+
+    return unplaced, num_servers
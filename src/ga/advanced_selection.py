@@ -4,65 +4,113 @@ to maintain better diversity.
 """
 
 import random
+from itertools import accumulate
 from typing import List
+import numpy as np
 from ..models import Solution
 from .operators import SelectionOperator
 
 
+def _population_stamp(population: List[Solution]) -> tuple:
+    """
+    O(1) fingerprint of a population: the list, its length, and its first
+    and last members with their fitness.
+
+    Selections compare it on every draw and prepare again on a mismatch, so
+    a different list, or the same list after it was sorted, resized or had
+    an end member replaced or re-scored, is never drawn from with stale
+    weights. Edits confined to the middle of the list are not detected.
+    """
+    if not population:
+        return id(population), 0
+    first, last = population[0], population[-1]
+    return id(population), len(population), id(first), id(last), first.fitness, last.fitness
+
+
 class RouletteWheelSelection(SelectionOperator):
     """
     Fitness-proportionate selection (Roulette Wheel).
     Better for maintaining diversity than tournament selection.
+
+    The cumulative wheel is built once per population by prepare() and
+    each spin is a binary search over it. select() and select_many()
+    prepare again when handed a different list, or the same list with a
+    different length or different first or last member or fitness. After
+    changing only members in the middle of the list (replacing or
+    re-scoring them), call prepare() before drawing again.
     """
-    
-    def select(self, population: List[Solution]) -> Solution:
+
+    def __init__(self):
+        self._population = None
+        self._stamp = None
+        self._cumulative = None
+
+    def prepare(self, population: List[Solution]):
         """
-        Select a solution based on fitness-proportionate probabilities.
-        Since we're minimizing, we need to invert the fitness values.
+        Build the roulette wheel for a population.
+        Since we're minimizing, the fitness values are inverted.
         """
         if not population:
             raise ValueError("Cannot select from empty population")
-        
-        # For minimization: convert fitness to selection probability
-        # Use inverse fitness (smaller fitness = higher probability)
-        min_fitness = min(sol.fitness for sol in population if sol.fitness is not None)
-        max_fitness = max(sol.fitness for sol in population if sol.fitness is not None)
-        
-        # Avoid division by zero
+
+        fitnesses = np.fromiter((sol.fitness for sol in population),
+                                dtype=np.float64, count=len(population))
+        min_fitness = fitnesses.min()
+        max_fitness = fitnesses.max()
+
+        # The list is kept alive so the id in its stamp cannot be reused
+        self._population = population
+        self._stamp = _population_stamp(population)
+        # Avoid division by zero: equal fitness means uniform selection
         if max_fitness == min_fitness:
-            return random.choice(population)
-        
-        # Calculate selection probabilities (inverse fitness)
-        # Add a small offset to avoid negative probabilities
+            self._cumulative = None
+            return
+
+        # Invert so that lower fitness = higher probability, with a small
+        # offset to avoid zero probabilities
         fitness_range = max_fitness - min_fitness
-        probabilities = []
-        
-        for sol in population:
-            # Invert so that lower fitness = higher probability
-            inverted_fitness = max_fitness - sol.fitness + 0.1 * fitness_range
-            probabilities.append(inverted_fitness)
-        
-        # Normalize probabilities
-        total = sum(probabilities)
-        probabilities = [p / total for p in probabilities]
-        
-        # Select using roulette wheel
-        r = random.random()
-        cumulative = 0.0
-        
-        for i, prob in enumerate(probabilities):
-            cumulative += prob
-            if r <= cumulative:
-                return population[i]
-        
-        # Fallback (should rarely happen)
-        return population[-1]
+        self._cumulative = np.cumsum(max_fitness - fitnesses + 0.1 * fitness_range)
+
+    def select(self, population: List[Solution]) -> Solution:
+        """
+        Select a solution based on fitness-proportionate probabilities.
+        """
+        if _population_stamp(population) != self._stamp:
+            self.prepare(population)
+
+        if self._cumulative is None:
+            return random.choice(population)
+        return population[self._spin(random.random())]
+
+    def select_many(self, population: List[Solution], n: int) -> List[Solution]:
+        """
+        Select `n` solutions at once, e.g. all parents for a generation.
+        """
+        if _population_stamp(population) != self._stamp:
+            self.prepare(population)
+
+        if self._cumulative is None:
+            return random.choices(population, k=n)
+
+        rng = np.random.default_rng(random.getrandbits(64))
+        return [population[i] for i in self._spin(rng.random(n))]
+
+    def _spin(self, r):
+        """Wheel index (or indices) for uniform draw(s) in [0, 1)."""
+        idx = np.searchsorted(self._cumulative, r * self._cumulative[-1])
+        return np.minimum(idx, len(self._cumulative) - 1)
 
 
 class RankSelection(SelectionOperator):
     """
     Rank-based selection to maintain diversity better.
     Reduces selection pressure compared to pure fitness selection.
+
+    prepare() ranks the population once; select() then only draws from
+    the ranked copy. select() ranks again when handed a different list, or
+    the same list with a different length or different first or last member
+    or fitness. After changing only members in the middle of the list
+    (replacing or re-scoring them), call prepare() before selecting again.
     """
     
     def __init__(self, selection_pressure: float = 1.5):
@@ -73,19 +121,24 @@ class RankSelection(SelectionOperator):
                 2.0 = maximum pressure (linear ranking)
         """
         self.selection_pressure = max(1.0, min(2.0, selection_pressure))
+        self._stamp = None
+        self.sorted_pop = []
+        self.cum_weights = []
     
-    def select(self, population: List[Solution]) -> Solution:
+    def prepare(self, population: List[Solution]):
         """
-        Select based on rank rather than raw fitness.
-        This reduces selection pressure and maintains diversity.
+        Rank a population and precompute its cumulative selection weights.
+        Call once per generation; select() then only does the draw.
         """
         if not population:
             raise ValueError("Cannot select from empty population")
-        
-        # Sort by fitness (best to worst for minimization)
-        sorted_pop = sorted(population, key=lambda s: s.fitness)
-        n = len(sorted_pop)
-        
+
+        # Sort by fitness (best to worst for minimization). sorted_pop keeps
+        # the stamped list's members alive, so their ids cannot be reused
+        self._stamp = _population_stamp(population)
+        self.sorted_pop = sorted(population, key=lambda s: s.fitness)
+        n = len(self.sorted_pop)
+
         # Calculate rank-based probabilities
         # Best solution gets highest rank (n), worst gets lowest (1)
         probabilities = []
@@ -93,6 +146,14 @@ class RankSelection(SelectionOperator):
             prob = (2 - self.selection_pressure) / n + \
                    (2 * rank * (self.selection_pressure - 1)) / (n * (n + 1))
             probabilities.append(prob)
-        
-        # Select using these probabilities
-        return random.choices(sorted_pop, weights=probabilities, k=1)[0]
+        self.cum_weights = list(accumulate(probabilities))
+
+    def select(self, population: List[Solution]) -> Solution:
+        """
+        Select based on rank rather than raw fitness.
+        This reduces selection pressure and maintains diversity.
+        """
+        if _population_stamp(population) != self._stamp:
+            self.prepare(population)
+
+        return random.choices(self.sorted_pop, cum_weights=self.cum_weights, k=1)[0]
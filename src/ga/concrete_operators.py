@@ -2,10 +2,19 @@
 Concrete implementations of the GA operators defined in operators.py
 """
 
+import heapq
 import random
-from typing import List, Tuple
-from ..models import Solution, Server
+from bisect import bisect
+from itertools import accumulate
+from operator import attrgetter
+from typing import List, Optional, Tuple, Union
+import numpy as np
+from ..models import Solution, Server, VirtualMachine, VMArrays
 from .operators import SelectionOperator, CrossoverOperator, MutationOperator
+from .vectorized import (
+    aligned_assignments, assignment_array, capacity_vector, crossover_vec,
+    demand_matrix, repair_vec
+)
 
 #
 # --- 1. CONCRETE SELECTION (No change, this is already good) ---
@@ -22,9 +31,23 @@ class TournamentSelection(SelectionOperator):
         Selects a single winner from a k-way tournament.
         """
         tournament_contestants = random.sample(population, self.k)
-        winner = min(tournament_contestants, key=lambda sol: sol.fitness)
+        winner = min(tournament_contestants, key=attrgetter('fitness'))
         return winner
 
+    def select_many(self, population: List[Solution], n: int) -> List[Solution]:
+        """
+        Run `n` independent tournaments at once, e.g. for all parents of a
+        generation. Contestants are drawn without replacement per tournament.
+        """
+        fitnesses = np.fromiter((sol.fitness for sol in population),
+                                dtype=np.float64, count=len(population))
+        rng = np.random.default_rng(random.getrandbits(64))
+        contestants = rng.random((n, len(population))).argpartition(
+            self.k - 1, axis=1)[:, :self.k]
+        winners = np.take_along_axis(
+            contestants, fitnesses[contestants].argmin(axis=1)[:, None], axis=1)[:, 0]
+        return [population[i] for i in winners]
+
 #
 # --- 2. CONCRETE CROSSOVER (NEW, REAL LOGIC,UPDATED) ---
 #
@@ -35,146 +58,99 @@ class VMMapCrossover(CrossoverOperator):
     
     This version is robust and can handle incomplete parents.
     """
-    
+
+    def __init__(self, all_vms: Optional[Union[List[VirtualMachine], VMArrays]] = None,
+                 server_template: Optional[Server] = None):
+        """
+        Args:
+            all_vms: All VMs of the scenario (or their VMArrays, to share
+                one with other code). When given together with
+                server_template, the VM list and demands are computed once
+                here instead of being rebuilt from the parents on every call
+            server_template: Template for the servers of the scenario
+        """
+        self._vm_arrays = None
+        if all_vms is not None and server_template is not None:
+            if not isinstance(all_vms, VMArrays):
+                all_vms = VMArrays.from_vms(all_vms)
+            self._vm_arrays = all_vms
+            self._server_template = server_template
+
     def crossover(self, parent1: Solution, parent2: Solution) -> Tuple[Solution, Solution]:
         """
         Creates two children by swapping VM-to-Server-ID assignments.
         """
-        
-        # 1. Get the VM assignment maps from both parents
-        map1 = parent1.get_vm_assignment()
-        map2 = parent2.get_vm_assignment()
-        
-        # --- FIX: Build a "master list" of all VMs from BOTH parents ---
-        all_vm_ids_set = set(map1.keys()) | set(map2.keys())
-        all_vm_ids = sorted(list(all_vm_ids_set))
-        
-        if not all_vm_ids:
-            # Handle edge case of empty solutions
-            return parent1.clone(), parent2.clone()
 
-        # --- FIX: Build a "master dictionary" of all VM objects ---
-        all_vms_dict = {}
-        for p in [parent1, parent2]:
-            for server in p.servers:
-                for vm in server.vms:
-                    all_vms_dict[vm.id] = vm
-        
-        # --- FIX: Get a valid server template ---
-        template_server = None
-        if parent1.servers:
-            template_server = parent1.servers[0]
-        elif parent2.servers:
-            template_server = parent2.servers[0]
+        # 1. Flatten both parents into assignment arrays (VM index -> server id)
+        # over a "master list" of all VMs sorted by id
+        if self._vm_arrays is not None:
+            vms, demand = self._vm_arrays.vms, self._vm_arrays.demand
+            server_template = self._server_template
+            assign1 = assignment_array(parent1, self._vm_arrays)
+            assign2 = assignment_array(parent2, self._vm_arrays)
         else:
-            # Both parents are empty
+            vms, assign1, assign2 = aligned_assignments(parent1, parent2)
+            demand = None
+
+        if not vms:
+            # Handle edge case of empty solutions
             return parent1.clone(), parent2.clone()
 
-        server_template = Server(
-            id=0,
-            max_cpu_cores=template_server.max_cpu_cores,
-            max_ram_gb=template_server.max_ram_gb,
-            max_storage_gb=template_server.max_storage_gb
-        )
+        if demand is None:
+            # --- FIX: Get a valid server template ---
+            template_server = None
+            if parent1.servers:
+                template_server = parent1.servers[0]
+            elif parent2.servers:
+                template_server = parent2.servers[0]
+            else:
+                # Both parents are empty
+                return parent1.clone(), parent2.clone()
+
+            server_template = Server(
+                id=0,
+                max_cpu_cores=template_server.max_cpu_cores,
+                max_ram_gb=template_server.max_ram_gb,
+                max_storage_gb=template_server.max_storage_gb
+            )
+            demand = demand_matrix(vms)
 
         # 2. Pick a random crossover point
-        cut_point = random.randint(1, len(all_vm_ids) - 1)
-        
-        # 3. Create two new child maps by swapping
-        child_map1 = {}
-        child_map2 = {}
-        
-        for i, vm_id in enumerate(all_vm_ids):
-            # --- FIX: Use .get() to avoid KeyErrors ---
-            # .get(vm_id) will return the server_id, or None if the key doesn't exist
-            server_id_1 = map1.get(vm_id)
-            server_id_2 = map2.get(vm_id)
-            
-            if i < cut_point:
-                child_map1[vm_id] = server_id_1
-                child_map2[vm_id] = server_id_2
-            else:
-                child_map1[vm_id] = server_id_2
-                child_map2[vm_id] = server_id_1
-        
+        cut_point = random.randint(1, len(vms) - 1)
+
+        # 3. Swap the tails of the assignment arrays
+        child_assign1, child_assign2 = crossover_vec(assign1, assign2, cut_point)
+
         # 4. Build the new child solutions
-        child1 = self._build_solution_from_map(child_map1, all_vms_dict, server_template)
-        child2 = self._build_solution_from_map(child_map2, all_vms_dict, server_template)
-        
+        child1 = self._build_solution_from_map(child_assign1, vms, demand, server_template)
+        child2 = self._build_solution_from_map(child_assign2, vms, demand, server_template)
+
         return child1, child2
 
-    def _build_solution_from_map(self, vm_map, vms_dict, server_template):
+    def _build_solution_from_map(self, assignment, vms, demand, server_template):
         """
-        Helper to build a Solution object from a VM-to-Server-ID map.
-        
-        This version attempts to place VMs according to the map, but
-        "repairs" the solution by placing any VMs that don't fit
-        (or are unassigned) into the first available server.
+        Helper to build a Solution object from a VM-to-Server-ID assignment array.
+
+        VMs are placed according to the array, and any VMs that don't fit
+        (or are unassigned) are "repaired" into the first available server.
+        The packing is worked out on arrays; Server objects are only built
+        once at the end.
         """
-        new_servers_dict = {}
-        unplaced_vms = []
-        
-        for vm_id, server_id in vm_map.items():
-            vm = vms_dict.get(vm_id)
-            if not vm:
-                continue
-                
-            # If VM was unassigned in the map, add to repair list
-            if server_id is None:
-                unplaced_vms.append(vm)
-                continue
-                
-            # Get or create the server for this ID
-            if server_id not in new_servers_dict:
-                new_servers_dict[server_id] = Server(
-                    id=server_id,
-                    max_cpu_cores=server_template.max_cpu_cores,
-                    max_ram_gb=server_template.max_ram_gb,
-                    max_storage_gb=server_template.max_storage_gb,
-                    name=f"Server-{server_id}"
-                )
-            
-            server = new_servers_dict[server_id]
-            
-            # --- THIS IS THE FIX ---
-            # Try to place the VM. If it fits, great.
-            if server.can_fit(vm):
-                server.add_vm(vm)
-            else:
-                # If it doesn't fit, add it to the repair list
-                unplaced_vms.append(vm)
-        
-        
-        # --- REPAIR STEP ---
-        # Now, try to pack all unplaced VMs using First-Fit
-        
-        server_list = list(new_servers_dict.values())
-        
-        for vm in unplaced_vms:
-            placed = False
-            # 1. Try to fit in an existing server
-            for server in server_list:
-                if server.can_fit(vm):
-                    server.add_vm(vm)
-                    placed = True
-                    break
-            
-            # 2. If it still wasn't placed, create a new server
-            if not placed:
-                new_id = len(server_list)
-                new_server = Server(
-                    id=new_id,
-                    max_cpu_cores=server_template.max_cpu_cores,
-                    max_ram_gb=server_template.max_ram_gb,
-                    max_storage_gb=server_template.max_storage_gb,
-                    name=f"Server-{new_id}"
-                )
-                
-                # We assume the VM can fit in an empty server
-                new_server.add_vm(vm)
-                server_list.append(new_server)
+        capacity = capacity_vector(server_template)
+        server_ids, members = repair_vec(assignment, demand, capacity)
+
+        servers = [
+            Server(
+                id=server_id,
+                max_cpu_cores=server_template.max_cpu_cores,
+                max_ram_gb=server_template.max_ram_gb,
+                max_storage_gb=server_template.max_storage_gb,
+                vms=[vms[i] for i in indices]
+            )
+            for server_id, indices in zip(server_ids, members)
+        ]
 
-        return Solution(servers=server_list)
+        return Solution(servers=servers)
 
 #
 # --- 3. CONCRETE MUTATION (NEW, REAL LOGIC) ---
@@ -184,6 +160,11 @@ class MoveVMMutation(MutationOperator):
     Mutates a solution by randomly moving VMs between servers
     or performing more aggressive mutations.
     """
+    # Mutation types and their cumulative selection weights
+    # Favor consolidation (server reduction) mutations
+    MUTATION_TYPES = ('move', 'swap', 'shuffle', 'consolidate', 'empty_server')
+    MUTATION_CUM_WEIGHTS = tuple(accumulate([0.25, 0.20, 0.15, 0.30, 0.10]))  # 40% server-reducing mutations
+
     def __init__(self, mutation_rate: float = 0.2):
         self.mutation_rate = mutation_rate
 
@@ -196,17 +177,22 @@ class MoveVMMutation(MutationOperator):
         if random.random() > self.mutation_rate:
             return solution # No mutation
             
-        # Clone the solution to avoid modifying the original
+        # Choose a mutation type with weighted probabilities (the same draw
+        # as random.choices, without rebuilding the weight table every call)
+        cum_weights = self.MUTATION_CUM_WEIGHTS
+        mutation_type = self.MUTATION_TYPES[
+            bisect(cum_weights, random.random() * cum_weights[-1], 0, len(cum_weights) - 1)
+        ]
+
+        # Skip the clone when the chosen mutation would be a no-op anyway
+        if not self._is_applicable(solution, mutation_type):
+            return solution
+
+        # Clone the solution to avoid modifying the original; the clone's
+        # fitness no longer applies once it is changed
         mutated_solution = solution.clone()
-        
-        # Choose a mutation type with weighted probabilities
-        # Favor consolidation (server reduction) mutations
-        mutation_type = random.choices(
-            ['move', 'swap', 'shuffle', 'consolidate', 'empty_server'],
-            weights=[0.25, 0.20, 0.15, 0.30, 0.10],  # 40% server-reducing mutations
-            k=1
-        )[0]
-        
+        mutated_solution.fitness = None
+
         if mutation_type == 'move':
             # Move a VM from one server to another
             mutated_solution = self._move_vm_mutation(mutated_solution)
@@ -225,6 +211,16 @@ class MoveVMMutation(MutationOperator):
         
         return mutated_solution
     
+    @staticmethod
+    def _is_applicable(solution: Solution, mutation_type: str) -> bool:
+        """Cheap pre-check of the guards each mutation type starts with."""
+        if mutation_type in ('move', 'consolidate'):
+            return len(solution.servers) >= 2
+        if mutation_type == 'shuffle':
+            return any(len(s.vms) > 1 for s in solution.servers)
+        # swap and empty_server need two non-empty servers
+        return sum(1 for s in solution.servers if s.vms) >= 2
+
     def _move_vm_mutation(self, solution: Solution) -> Solution:
         """Move a random VM from one server to another."""
         if len(solution.servers) < 2:
@@ -257,40 +253,27 @@ class MoveVMMutation(MutationOperator):
         vm1 = random.choice(s1.vms)
         vm2 = random.choice(s2.vms)
         
-        # Check if swap is feasible
-        s1.remove_vm(vm1)
-        s2.remove_vm(vm2)
-        
-        can_swap = s1.can_fit(vm2) and s2.can_fit(vm1)
-        
-        if can_swap:
+        # Check if swap is feasible before touching either server
+        if s1.can_swap(vm1, vm2) and s2.can_swap(vm2, vm1):
+            s1.remove_vm(vm1)
+            s2.remove_vm(vm2)
             s1.add_vm(vm2)
             s2.add_vm(vm1)
-        else:
-            # Restore original state
-            s1.add_vm(vm1)
-            s2.add_vm(vm2)
         
         return solution
     
     def _shuffle_server_mutation(self, solution: Solution) -> Solution:
-        """Remove all VMs from a server and re-add them in random order."""
+        """Re-pack the VMs of a server in random order."""
         servers_with_vms = [s for s in solution.servers if len(s.vms) > 1]
         if not servers_with_vms:
             return solution
         
         server = random.choice(servers_with_vms)
-        vms = list(server.vms)
-        
-        # Clear the server
-        for vm in vms:
-            server.remove_vm(vm)
-        
-        # Re-add in random order
-        random.shuffle(vms)
-        for vm in vms:
-            server.add_vm(vm)
-        
+
+        # Re-adding the same VMs always fits and only changes their order,
+        # so shuffle the VM list in place instead of emptying and refilling
+        random.shuffle(server.vms)
+
         return solution
     
     def _consolidate_servers_mutation(self, solution: Solution) -> Solution:
@@ -301,27 +284,30 @@ class MoveVMMutation(MutationOperator):
         if len(solution.servers) < 2:
             return solution
         
-        # Sort servers by VM count (try to empty smaller servers first)
-        sorted_servers = sorted(solution.servers, key=lambda s: len(s.vms))
+        # Servers with the fewest VMs (try to empty smaller servers first);
+        # a partial sort, same order as sorted(...)[:3]
+        smallest_servers = heapq.nsmallest(3, solution.servers, key=lambda s: len(s.vms))
         
         # Try to consolidate a small server into a larger one
-        for source_server in sorted_servers[:3]:  # Try 3 smallest
+        for source_server in smallest_servers:  # Try 3 smallest
             if not source_server.vms:
                 continue
             
             # Find target servers that might have capacity
-            potential_targets = [s for s in solution.servers if s != source_server]
+            potential_targets = [s for s in solution.servers if s is not source_server]
             random.shuffle(potential_targets)
             
             for target_server in potential_targets[:5]:  # Try up to 5 targets
                 # Try to move all VMs from source to target
                 vms_to_move = list(source_server.vms)
+                moved = []
                 success = True
                 
                 for vm in vms_to_move:
                     if target_server.can_fit(vm):
                         source_server.remove_vm(vm)
                         target_server.add_vm(vm)
+                        moved.append(vm)
                     else:
                         success = False
                         break
@@ -331,10 +317,9 @@ class MoveVMMutation(MutationOperator):
                     return solution
                 else:
                     # Revert moves
-                    for vm in vms_to_move:
-                        if vm in target_server.vms:
-                            target_server.remove_vm(vm)
-                            source_server.add_vm(vm)
+                    for vm in moved:
+                        target_server.remove_vm(vm)
+                        source_server.add_vm(vm)
         
         return solution
     
@@ -351,7 +336,7 @@ class MoveVMMutation(MutationOperator):
         source_server = random.choice(sorted_servers[:max(1, len(sorted_servers)//2)])
         
         vms_to_relocate = list(source_server.vms)
-        other_servers = [s for s in solution.servers if s != source_server]
+        other_servers = [s for s in solution.servers if s is not source_server]
         
         for vm in vms_to_relocate:
             # Try to find a server that can fit this VM
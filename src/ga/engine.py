@@ -5,233 +5,203 @@ This module contains the logic for running the evolutionary process,
 including population initialization and the main GA loop.
 """
 
+import multiprocessing
 import random
-from typing import List
-from ..models import VirtualMachine, Server, Solution
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from operator import attrgetter
+from typing import List, Optional
+import numpy as np
+from ..models import VirtualMachine, Server, Solution, VMArrays
 
 # --- GA Imports ---
 from .simple_fitness import SimpleFitnessEvaluator, INVALID_PENALTY
 from .concrete_operators import TournamentSelection, VMMapCrossover, MoveVMMutation
 from .advanced_selection import RankSelection
 from .local_search import local_search_improvement
+from .vectorized import (
+    UNASSIGNED, assignment_array, demand_matrix, pack_vms, solution_from_assignment
+)
+from ._packing_numba import BEST_FIT, FIRST_FIT, HAS_NUMBA, WORST_FIT
 
 # --- Utility Imports ---
 from ..utils.data_generator import DataGenerator
 
-def _create_solution_first_fit(vms: List[VirtualMachine], server_template: Server) -> Solution:
+def _create_solution_first_fit(vms: List[VirtualMachine], server_template: Server,
+                               demand: Optional[np.ndarray] = None) -> Solution:
     """
     Creates a single solution using a simple First-Fit heuristic.
     (Helper function for initialization)
     """
-    servers = [] 
-    server_pool = [] 
-
-    for vm in vms:
-        placed = False
-        # 1. Try to place in an existing server
-        for server in server_pool:
-            if server.add_vm(vm):
-                placed = True
-                break
-        
-        # 2. If it couldn't be placed, create a new server
-        if not placed:
-            new_server = Server(
-                id=len(server_pool), 
-                max_cpu_cores=server_template.max_cpu_cores,
-                max_ram_gb=server_template.max_ram_gb,
-                max_storage_gb=server_template.max_storage_gb,
-                name=f"Server-{len(server_pool)}"
-            )
-            
-            if new_server.add_vm(vm):
-                server_pool.append(new_server)
-            else:
-                print(f"Warning: VM {vm.id} could not be placed in a new server.")
-
-    return Solution(servers=server_pool)
+    assignment, num_servers = pack_vms(vms, server_template, FIRST_FIT, demand)
+    return solution_from_assignment(vms, assignment, num_servers, server_template,
+                                     warn_unplaced=True)
 
 
-def _create_solution_best_fit(vms: List[VirtualMachine], server_template: Server) -> Solution:
+def _create_solution_best_fit(vms: List[VirtualMachine], server_template: Server,
+                              demand: Optional[np.ndarray] = None) -> Solution:
     """
     Creates a solution using Best-Fit heuristic.
     Places each VM in the server with the least remaining capacity that can still fit it.
     """
-    server_pool = []
-    
-    for vm in vms:
-        best_server = None
-        min_remaining_capacity = float('inf')
-        
-        # Find server with minimum remaining capacity that can fit this VM
-        for server in server_pool:
-            if server.can_fit(vm):
-                # Calculate remaining capacity after adding this VM
-                remaining = (server.available_cpu - vm.cpu_cores +
-                           (server.available_ram - vm.ram_gb) / 10 +
-                           (server.available_storage - vm.storage_gb) / 100)
-                
-                if remaining < min_remaining_capacity:
-                    min_remaining_capacity = remaining
-                    best_server = server
-        
-        if best_server:
-            best_server.add_vm(vm)
-        else:
-            # Create new server
-            new_server = Server(
-                id=len(server_pool),
-                max_cpu_cores=server_template.max_cpu_cores,
-                max_ram_gb=server_template.max_ram_gb,
-                max_storage_gb=server_template.max_storage_gb,
-                name=f"Server-{len(server_pool)}"
-            )
-            if new_server.add_vm(vm):
-                server_pool.append(new_server)
-    
-    return Solution(servers=server_pool)
+    assignment, num_servers = pack_vms(vms, server_template, BEST_FIT, demand)
+    return solution_from_assignment(vms, assignment, num_servers, server_template)
 
 
-def _create_solution_worst_fit(vms: List[VirtualMachine], server_template: Server) -> Solution:
+def _create_solution_worst_fit(vms: List[VirtualMachine], server_template: Server,
+                               demand: Optional[np.ndarray] = None) -> Solution:
     """
     Creates a solution using Worst-Fit heuristic.
     Places each VM in the server with the most remaining capacity.
     """
-    server_pool = []
-    
-    for vm in vms:
-        worst_server = None
-        max_remaining_capacity = -1
-        
-        # Find server with maximum remaining capacity that can fit this VM
-        for server in server_pool:
-            if server.can_fit(vm):
-                # Calculate remaining capacity after adding this VM
-                remaining = (server.available_cpu - vm.cpu_cores +
-                           (server.available_ram - vm.ram_gb) / 10 +
-                           (server.available_storage - vm.storage_gb) / 100)
-                
-                if remaining > max_remaining_capacity:
-                    max_remaining_capacity = remaining
-                    worst_server = server
-        
-        if worst_server:
-            worst_server.add_vm(vm)
-        else:
-            # Create new server
-            new_server = Server(
-                id=len(server_pool),
-                max_cpu_cores=server_template.max_cpu_cores,
-                max_ram_gb=server_template.max_ram_gb,
-                max_storage_gb=server_template.max_storage_gb,
-                name=f"Server-{len(server_pool)}"
-            )
-            if new_server.add_vm(vm):
-                server_pool.append(new_server)
-    
-    return Solution(servers=server_pool)
+    assignment, num_servers = pack_vms(vms, server_template, WORST_FIT, demand)
+    return solution_from_assignment(vms, assignment, num_servers, server_template)
+
 
+def _local_search_many(solutions: List[Solution], max_iterations: int,
+                       executor: Optional[ProcessPoolExecutor] = None) -> List[Solution]:
+    """local_search_improvement of every solution, on the executor's processes if given."""
+    if executor is None:
+        return [local_search_improvement(sol, max_iterations) for sol in solutions]
+    return list(executor.map(local_search_improvement, solutions, repeat(max_iterations)))
 
-def _calculate_diversity(population: List[Solution]) -> float:
+
+def _calculate_diversity(population: List[Solution],
+                         vm_arrays: Optional[VMArrays] = None) -> float:
     """
     Calculate population diversity as average normalized Hamming distance
     between VM-to-server assignments.
     
+    Args:
+        vm_arrays: All VMs of the scenario, if known (lets the assignment
+            arrays cached on the solutions be reused)
+    
     Returns:
         Float between 0.0 (all identical) and 1.0 (completely diverse)
     """
     if len(population) < 2:
         return 1.0
     
-    distances = []
     sample_size = min(20, len(population))  # Sample for efficiency
     sampled = random.sample(population, sample_size)
     
-    for i in range(len(sampled)):
-        for j in range(i + 1, len(sampled)):
-            sol1_map = sampled[i].get_vm_assignment()
-            sol2_map = sampled[j].get_vm_assignment()
-            
-            # Get all VM IDs from both solutions
-            all_vms = set(sol1_map.keys()) | set(sol2_map.keys())
-            if not all_vms:
-                continue
-            
-            # Count differences
-            differences = 0
-            for vm_id in all_vms:
-                server1 = sol1_map.get(vm_id)
-                server2 = sol2_map.get(vm_id)
-                if server1 != server2:
-                    differences += 1
-            
-            # Normalize by number of VMs
-            normalized_distance = differences / len(all_vms) if all_vms else 0
-            distances.append(normalized_distance)
+    if vm_arrays is None:
+        vm_arrays = VMArrays.from_vms({vm.id: vm for sol in sampled
+                                       for server in sol.servers for vm in server.vms}.values())
+    
+    # Assignment of every sampled solution, built once (not once per pair)
+    assignments = np.array([assignment_array(sol, vm_arrays) for sol in sampled])
+    present = assignments != UNASSIGNED
+    
+    # All pairs at once: VMs in either solution, and how many of them are
+    # on a different server
+    first, second = np.triu_indices(len(sampled), k=1)
+    num_vms = (present[first] | present[second]).sum(axis=1)
+    differences = (assignments[first] != assignments[second]).sum(axis=1)
+    
+    # Normalize by number of VMs
+    distances = [diff / total for diff, total in zip(differences.tolist(), num_vms.tolist())
+                 if total]
     
     return sum(distances) / len(distances) if distances else 0.0
 
 
+# Sort keys for the initial-population strategies
+_SORT_KEYS = {
+    'demand': attrgetter('composite_score'),
+    'cpu': attrgetter('cpu_cores'),
+    'ram': attrgetter('ram_gb'),
+    'storage': attrgetter('storage_gb'),
+}
+
+
 def create_initial_population(vms: List[VirtualMachine], 
                               server_template: Server, 
-                              size: int) -> List[Solution]:
+                              size: int,
+                              n_workers: Optional[int] = None) -> List[Solution]:
     """
     Creates the initial population (Generation 0) for the GA.
     Uses different strategies to ensure diversity AND quality.
+    
+    Args:
+        n_workers: Pack the solutions on this many threads. The VM orders
+            (which use the random module) are always drawn in sequence, so
+            the population is the same either way; threads only pay off
+            with Numba, whose packing kernel releases the GIL
     """
-    population = []
-    vms_to_pack = list(vms)
+    jobs = []
+    # The order being packed, as indices into `vms`, so every solution can
+    # take its rows of one demand matrix instead of rebuilding it
+    vms = list(vms)
+    order = list(range(len(vms)))
+    demand = demand_matrix(vms) if HAS_NUMBA else None
     
     # Enhanced strategies with better heuristics
     strategies = ['random', 'largest_first', 'smallest_first', 'balanced', 
                   'best_fit_decreasing', 'worst_fit', 'cpu_focused', 'ram_focused']
     
+    # Every sorted order is computed once and reused by all the solutions
+    # that need it
+    sorted_orders = {}
+    
+    def sort_vms(key: str, reverse: bool = False):
+        sorted_order = sorted_orders.get((key, reverse))
+        if sorted_order is None:
+            sort_key = _SORT_KEYS[key]
+            sorted_order = sorted(range(len(vms)), key=lambda i: sort_key(vms[i]),
+                                  reverse=reverse)
+            sorted_orders[key, reverse] = sorted_order
+        order[:] = sorted_order
+    
     for i in range(size):
         # Use different sorting strategies for diversity
         strategy = strategies[i % len(strategies)]
         
         if strategy == 'random':
-            random.shuffle(vms_to_pack)
+            random.shuffle(order)
         elif strategy == 'largest_first':
             # Sort by total resource demand (descending)
-            vms_to_pack.sort(key=lambda v: v.cpu_cores + v.ram_gb/10 + v.storage_gb/100, reverse=True)
+            sort_vms('demand', reverse=True)
         elif strategy == 'smallest_first':
             # Sort by total resource demand (ascending)
-            vms_to_pack.sort(key=lambda v: v.cpu_cores + v.ram_gb/10 + v.storage_gb/100)
+            sort_vms('demand')
         elif strategy == 'best_fit_decreasing':
             # Sort by total demand, use best-fit placement
-            vms_to_pack.sort(key=lambda v: v.cpu_cores + v.ram_gb/10 + v.storage_gb/100, reverse=True)
+            sort_vms('demand', reverse=True)
         elif strategy == 'worst_fit':
             # Sort by total demand, use worst-fit placement
-            vms_to_pack.sort(key=lambda v: v.cpu_cores + v.ram_gb/10 + v.storage_gb/100, reverse=True)
+            sort_vms('demand', reverse=True)
         elif strategy == 'cpu_focused':
             # Sort by CPU cores
-            vms_to_pack.sort(key=lambda v: v.cpu_cores, reverse=True)
+            sort_vms('cpu', reverse=True)
         elif strategy == 'ram_focused':
             # Sort by RAM
-            vms_to_pack.sort(key=lambda v: v.ram_gb, reverse=True)
+            sort_vms('ram', reverse=True)
         else:  # balanced
             # Sort by a random resource dimension
             dimension = random.choice(['cpu', 'ram', 'storage'])
-            if dimension == 'cpu':
-                vms_to_pack.sort(key=lambda v: v.cpu_cores, reverse=random.choice([True, False]))
-            elif dimension == 'ram':
-                vms_to_pack.sort(key=lambda v: v.ram_gb, reverse=random.choice([True, False]))
-            else:
-                vms_to_pack.sort(key=lambda v: v.storage_gb, reverse=random.choice([True, False]))
+            sort_vms(dimension, reverse=random.choice([True, False]))
         
         # Use appropriate packing method
         if strategy == 'best_fit_decreasing':
-            solution = _create_solution_best_fit(vms_to_pack, server_template)
+            create_solution = _create_solution_best_fit
         elif strategy == 'worst_fit':
-            solution = _create_solution_worst_fit(vms_to_pack, server_template)
+            create_solution = _create_solution_worst_fit
         else:
-            solution = _create_solution_first_fit(vms_to_pack, server_template)
-            
+            create_solution = _create_solution_first_fit
+        jobs.append((create_solution, list(order)))
+    
+    def build(job) -> Solution:
+        create_solution, job_order = job
+        solution = create_solution([vms[i] for i in job_order], server_template,
+                                   None if demand is None else demand[job_order])
         solution.generation = 0
-        population.append(solution)
-        
-    return population
+        return solution
+    
+    if n_workers and n_workers > 1:
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            return list(executor.map(build, jobs))
+    return [build(job) for job in jobs]
 
 #
 # --- THIS IS THE MISSING run_ga FUNCTION ---
@@ -244,12 +214,19 @@ def run_ga(vms: List[VirtualMachine],
            mutation_rate: float = 0.3,
            tournament_k: int = 3,
            use_local_search: bool = False,
-           return_population: bool = False):
+           return_population: bool = False,
+           n_workers: Optional[int] = None,
+           local_search_workers: Optional[int] = None):
     """
     Runs the full Genetic Algorithm using operator classes.
     
     Args:
         return_population: If True, returns (best_solution, population), else just best_solution
+        n_workers: Threads used to build the initial population and
+            immigrants (see create_initial_population)
+        local_search_workers: With use_local_search, run each generation's
+            local searches on this many processes. Local search is
+            deterministic, so the result is the same either way
     
     Returns:
         Solution or Tuple[Solution, List[Solution]]
@@ -264,7 +241,8 @@ def run_ga(vms: List[VirtualMachine],
     tournament_selection = TournamentSelection(k=tournament_k)
     rank_selection = RankSelection(selection_pressure=1.5)
     
-    crossover_op = VMMapCrossover()
+    vm_arrays = VMArrays.from_vms(vms)
+    crossover_op = VMMapCrossover(vm_arrays, server_template)
     
     # Start with higher mutation rate, decrease over time
     base_mutation_rate = mutation_rate
@@ -275,115 +253,150 @@ def run_ga(vms: List[VirtualMachine],
     
     # 2. Create Initial Population (Generation 0)
     print(f"Creating initial population (size={population_size})...")
-    population = create_initial_population(vms, server_template, population_size)
+    population = create_initial_population(vms, server_template, population_size, n_workers)
     
     # 3. Run Evolutionary Loop
     best_ever_fitness = float('inf')
     stagnation_counter = 0
+    population_evaluated = False
     
-    for gen in range(generations):
+    # Shut down in the finally below, also if the loop raises
+    local_search_pool = None
+    if use_local_search and local_search_workers and local_search_workers > 1:
+        # Spawned, not forked: forking after Numba's threading layer has
+        # started leaves the workers unable to shut down
+        local_search_pool = ProcessPoolExecutor(max_workers=local_search_workers,
+                                                mp_context=multiprocessing.get_context('spawn'))
+    
+    try:
+        for gen in range(generations):
         
-        # 3a. Evaluate Population
-        for sol in population:
-            evaluator.evaluate(sol) # Fitness is set on sol.fitness
+            # 3a. Evaluate Population (batched; fitness is set on sol.fitness).
+            # Elites and local-search results already carry their fitness; new
+            # and mutated solutions have none
+            evaluator.evaluate_population([sol for sol in population if sol.fitness is None])
             
-        population.sort(key=lambda sol: sol.fitness)
+            population.sort(key=lambda sol: sol.fitness)
         
-        best_fitness = population[0].fitness
-        best_servers = population[0].num_servers_used
-        worst_fitness = population[-1].fitness
+            best_fitness = population[0].fitness
+            best_servers = population[0].num_servers_used
+            worst_fitness = population[-1].fitness
         
-        # Calculate diversity: average distance between solutions
-        diversity = _calculate_diversity(population)
+            # Calculate diversity: average distance between solutions
+            diversity = _calculate_diversity(population, vm_arrays)
         
-        # Track improvement for early stopping
-        if best_fitness < best_ever_fitness:
-            best_ever_fitness = best_fitness
-            stagnation_counter = 0
-        else:
-            stagnation_counter += 1
+            # Track improvement for early stopping
+            if best_fitness < best_ever_fitness:
+                best_ever_fitness = best_fitness
+                stagnation_counter = 0
+            else:
+                stagnation_counter += 1
         
-        # Adaptive mutation rate - increase when stagnating OR low diversity
-        if stagnation_counter > 10 or diversity < diversity_threshold:
-            current_mutation_rate = min(0.7, base_mutation_rate * (1 + stagnation_counter / 15))
-            mutation_op.mutation_rate = current_mutation_rate
-        else:
-            mutation_op.mutation_rate = base_mutation_rate
+            # Adaptive mutation rate - increase when stagnating OR low diversity
+            if stagnation_counter > 10 or diversity < diversity_threshold:
+                current_mutation_rate = min(0.7, base_mutation_rate * (1 + stagnation_counter / 15))
+                mutation_op.mutation_rate = current_mutation_rate
+            else:
+                mutation_op.mutation_rate = base_mutation_rate
             
-        print(f"Generation {gen+1}/{generations}: Best={best_fitness:.2f} ({best_servers} servers), "
-              f"Worst={worst_fitness:.2f}, Diversity={diversity:.3f}, "
-              f"Stagnation={stagnation_counter}, MutRate={mutation_op.mutation_rate:.2f}")
+            print(f"Generation {gen+1}/{generations}: Best={best_fitness:.2f} ({best_servers} servers), "
+                  f"Worst={worst_fitness:.2f}, Diversity={diversity:.3f}, "
+                  f"Stagnation={stagnation_counter}, MutRate={mutation_op.mutation_rate:.2f}")
 
-        # Early stopping if no improvement for too long
-        if stagnation_counter >= 30:
-            print(f"Stopping early - no improvement for {stagnation_counter} generations")
-            break
+            # Early stopping if no improvement for too long
+            if stagnation_counter >= 30:
+                print(f"Stopping early - no improvement for {stagnation_counter} generations")
+                # This population was just evaluated and sorted above
+                population_evaluated = True
+                break
 
-        # 3b. Create Next Generation
-        new_population = []
+            # 3b. Create Next Generation
+            new_population = []
         
-        # Elitism: The best solutions survive unchanged
-        for i in range(elitism_count):
-            elite = population[i].clone()
-            elite.generation = gen + 1
-            new_population.append(elite)
+            # Elitism: The best solutions survive unchanged. Operators never
+            # modify a solution in place (they clone first), so elites are
+            # carried over without copying
+            for i in range(elitism_count):
+                elite = population[i]
+                elite.generation = gen + 1
+                new_population.append(elite)
         
-        # Immigration: Inject random solutions if diversity is too low
-        immigration_count = 0
-        if diversity < diversity_threshold:
-            immigration_count = max(2, int(population_size * 0.1))  # 10% immigrants
-            print(f"  -> Low diversity! Injecting {immigration_count} random immigrants")
-            immigrants = create_initial_population(vms, server_template, immigration_count)
-            for immigrant in immigrants:
-                immigrant.generation = gen + 1
-                new_population.append(immigrant)
+            # Immigration: Inject random solutions if diversity is too low
+            immigration_count = 0
+            if diversity < diversity_threshold:
+                immigration_count = max(2, int(population_size * 0.1))  # 10% immigrants
+                print(f"  -> Low diversity! Injecting {immigration_count} random immigrants")
+                immigrants = create_initial_population(vms, server_template, immigration_count,
+                                                       n_workers)
+                for immigrant in immigrants:
+                    immigrant.generation = gen + 1
+                    new_population.append(immigrant)
             
-        # 3c. Crossover & Mutation Loop
-        while len(new_population) < population_size:
-            # Alternate between selection strategies for diversity
-            if random.random() < 0.7:
-                parent1 = tournament_selection.select(population)
-                parent2 = tournament_selection.select(population)
-            else:
-                parent1 = rank_selection.select(population)
-                parent2 = rank_selection.select(population)
+            # 3c. Crossover & Mutation Loop
+            # Rank the population once; every rank selection below reuses it
+            rank_selection.prepare(population)
+            # Tournaments for every pair this generation could need, run in one batch
+            num_pairs = (population_size - len(new_population) + 1) // 2
+            tournament_parents = iter(tournament_selection.select_many(population, 2 * num_pairs))
+            # Positions of the children picked for local search, run in one batch
+            search_children = []
+            while len(new_population) < population_size:
+                # Alternate between selection strategies for diversity
+                if random.random() < 0.7:
+                    parent1 = next(tournament_parents)
+                    parent2 = next(tournament_parents)
+                else:
+                    parent1 = rank_selection.select(population)
+                    parent2 = rank_selection.select(population)
             
-            # Crossover
-            child1, child2 = crossover_op.crossover(parent1, parent2)
+                # Crossover
+                child1, child2 = crossover_op.crossover(parent1, parent2)
             
-            # Mutation - apply multiple times if diversity is low
-            mutation_intensity = 2 if diversity < diversity_threshold else 1
-            for _ in range(mutation_intensity):
-                child1 = mutation_op.mutate(child1)
-                child2 = mutation_op.mutate(child2)
+                # Mutation - apply multiple times if diversity is low
+                mutation_intensity = 2 if diversity < diversity_threshold else 1
+                for _ in range(mutation_intensity):
+                    child1 = mutation_op.mutate(child1)
+                    child2 = mutation_op.mutate(child2)
             
-            # Set generation
-            child1.generation = gen + 1
-            child2.generation = gen + 1
+                # Set generation
+                child1.generation = gen + 1
+                child2.generation = gen + 1
             
-            # Optional: Apply local search to children
-            if use_local_search and random.random() < 0.2:  # 20% chance
-                child1 = local_search_improvement(child1, max_iterations=5)
-            if use_local_search and random.random() < 0.2:
-                child2 = local_search_improvement(child2, max_iterations=5)
+                # Optional: Apply local search to children
+                search1 = use_local_search and random.random() < 0.2  # 20% chance
+                search2 = use_local_search and random.random() < 0.2
             
-            # Add both children (if space allows)
-            new_population.append(child1)
-            if len(new_population) < population_size:
-                new_population.append(child2)
+                # Add both children (if space allows)
+                if search1:
+                    search_children.append(len(new_population))
+                new_population.append(child1)
+                if len(new_population) < population_size:
+                    if search2:
+                        search_children.append(len(new_population))
+                    new_population.append(child2)
+        
+            if search_children:
+                improved = _local_search_many([new_population[i] for i in search_children], 5,
+                                              local_search_pool)
+                for i, solution in zip(search_children, improved):
+                    new_population[i] = solution
         
-        # *** CRITICAL FIX: Update population with new generation ***
-        population = new_population
+            # *** CRITICAL FIX: Update population with new generation ***
+            population = new_population
         
-        # Optional: Apply local search to best solutions periodically
-        if use_local_search and (gen + 1) % 10 == 0:
-            for i in range(min(3, len(population))):
-                population[i] = local_search_improvement(population[i], max_iterations=10)
+            # Optional: Apply local search to best solutions periodically
+            if use_local_search and (gen + 1) % 10 == 0:
+                population[:3] = _local_search_many(population[:3], 10, local_search_pool)
+    
+    finally:
+        if local_search_pool is not None:
+            local_search_pool.shutdown()
 
     # 4. Return Best Solution and optionally the population
-    for sol in population:
-        evaluator.evaluate(sol)
-    population.sort(key=lambda sol: sol.fitness)
+    # (the last generation bred by the loop still needs scoring)
+    if not population_evaluated:
+        evaluator.evaluate_population([sol for sol in population if sol.fitness is None])
+        population.sort(key=lambda sol: sol.fitness)
     
     best_solution = population[0]
     
@@ -4,8 +4,12 @@ Applies hill-climbing to improve solutions found by GA.
 """
 
 import random
-from typing import List
+from typing import List, Optional, Tuple
 from ..models import Solution, VirtualMachine, Server
+from .simple_fitness import SimpleFitnessEvaluator
+
+# The evaluator holds no state, so every call shares one bound method
+_evaluate = SimpleFitnessEvaluator().evaluate
 
 
 def local_search_improvement(solution: Solution, max_iterations: int = 10) -> Solution:
@@ -20,11 +24,8 @@ def local_search_improvement(solution: Solution, max_iterations: int = 10) -> So
     Returns:
         Improved solution (or original if no improvement found)
     """
-    from ..ga.simple_fitness import SimpleFitnessEvaluator
-    
-    evaluator = SimpleFitnessEvaluator()
     current_solution = solution.clone()
-    evaluator.evaluate(current_solution)
+    _evaluate(current_solution)
     best_fitness = current_solution.fitness
     
     improved = True
@@ -34,7 +35,9 @@ def local_search_improvement(solution: Solution, max_iterations: int = 10) -> So
         improved = False
         iterations += 1
         
-        # Try different improvement strategies
+        # Try different improvement strategies. Each one changes the
+        # solution in place and returns what is needed to undo it (None if
+        # it changed nothing), so failed attempts cost no clone
         strategies = [
             _try_consolidate_servers,
             _try_move_to_less_full_server,
@@ -42,29 +45,41 @@ def local_search_improvement(solution: Solution, max_iterations: int = 10) -> So
         ]
         
         for strategy in strategies:
-            candidate = strategy(current_solution)
-            evaluator.evaluate(candidate)
+            undo = strategy(current_solution)
+            if undo is None:
+                continue
             
-            if candidate.fitness < best_fitness:
-                current_solution = candidate
-                best_fitness = candidate.fitness
+            if _evaluate(current_solution) < best_fitness:
+                best_fitness = current_solution.fitness
                 improved = True
                 break
+            
+            _undo(undo)
+            current_solution.fitness = best_fitness
     
     return current_solution
 
 
-def _try_consolidate_servers(solution: Solution) -> Solution:
+def _snapshot(servers: List[Server]) -> List[Tuple[Server, Server]]:
+    """Copies of the given servers, for _undo"""
+    return [(server, server.copy()) for server in servers]
+
+
+def _undo(snapshots: List[Tuple[Server, Server]]):
+    """Put servers back the way _snapshot saw them"""
+    for server, snapshot in snapshots:
+        server.restore(snapshot)
+
+
+def _try_consolidate_servers(solution: Solution) -> Optional[List[Tuple[Server, Server]]]:
     """
     Try to move VMs from the least-full server to other servers.
     If successful, reduces server count.
     """
-    improved = solution.clone()
-    
     # Find servers with VMs, sorted by utilization
-    servers_with_vms = [s for s in improved.servers if s.vms]
+    servers_with_vms = [s for s in solution.servers if s.vms]
     if len(servers_with_vms) <= 1:
-        return improved
+        return None
     
     # Try to empty the least utilized server
     servers_with_vms.sort(key=lambda s: len(s.vms))
@@ -73,38 +88,30 @@ def _try_consolidate_servers(solution: Solution) -> Solution:
     # Try to move all VMs from source to other servers
     vms_to_move = list(source_server.vms)
     target_servers = [s for s in servers_with_vms if s.id != source_server.id]
+    undo = _snapshot(servers_with_vms)
     
-    all_moved = True
     for vm in vms_to_move:
-        placed = False
         for target in target_servers:
             if target.can_fit(vm):
                 source_server.remove_vm(vm)
                 target.add_vm(vm)
-                placed = True
                 break
-        
-        if not placed:
-            all_moved = False
-            break
-    
-    # If we couldn't move all VMs, restore
-    if not all_moved:
-        return solution.clone()
+        else:
+            # If we couldn't move all VMs, restore
+            _undo(undo)
+            return None
     
-    return improved
+    return undo
 
 
-def _try_move_to_less_full_server(solution: Solution) -> Solution:
+def _try_move_to_less_full_server(solution: Solution) -> Optional[List[Tuple[Server, Server]]]:
     """
     Try to move VMs from fuller servers to less full servers
     to improve utilization balance.
     """
-    improved = solution.clone()
-    
-    servers_with_vms = [s for s in improved.servers if s.vms]
+    servers_with_vms = [s for s in solution.servers if s.vms]
     if len(servers_with_vms) <= 1:
-        return improved
+        return None
     
     # Sort by utilization (descending)
     servers_with_vms.sort(key=lambda s: s.utilization_cpu, reverse=True)
@@ -113,35 +120,32 @@ def _try_move_to_less_full_server(solution: Solution) -> Solution:
     source = servers_with_vms[0]
     target = servers_with_vms[-1]
     
-    if not source.vms:
-        return improved
-    
     # Try to move the smallest VM from source to target
     vms_sorted = sorted(source.vms, key=lambda v: v.cpu_cores)
     
     for vm in vms_sorted:
         if target.can_fit(vm):
+            undo = _snapshot([source, target])
             source.remove_vm(vm)
             target.add_vm(vm)
-            return improved
+            return undo
     
-    return solution.clone()
+    return None
 
 
-def _try_repack_fullest_server(solution: Solution) -> Solution:
+def _try_repack_fullest_server(solution: Solution) -> Optional[List[Tuple[Server, Server]]]:
     """
     Try to remove and repack VMs on the fullest server
     in a different order to improve packing.
     """
-    improved = solution.clone()
-    
-    servers_with_vms = [s for s in improved.servers if len(s.vms) > 1]
+    servers_with_vms = [s for s in solution.servers if len(s.vms) > 1]
     if not servers_with_vms:
-        return improved
+        return None
     
     # Find the fullest server
     servers_with_vms.sort(key=lambda s: s.utilization_cpu, reverse=True)
     server = servers_with_vms[0]
+    undo = _snapshot([server])
     
     # Remove all VMs and try to repack in better order
     vms = list(server.vms)
@@ -154,7 +158,8 @@ def _try_repack_fullest_server(solution: Solution) -> Solution:
     for vm in vms:
         if not server.can_fit(vm):
             # If any VM doesn't fit, restore original
-            return solution.clone()
+            _undo(undo)
+            return None
         server.add_vm(vm)
     
-    return improved
+    return undo
@@ -4,8 +4,17 @@ This version focuses on clarity and effective operators.
 """
 
 import random
-from typing import List
-from ..models import VirtualMachine, Server, Solution
+from operator import attrgetter
+from typing import List, Optional
+import numpy as np
+from ..models import VirtualMachine, Server, Solution, VMArrays
+from ._codegen import solution_stats
+from .concrete_operators import TournamentSelection
+from ._packing_numba import FIRST_FIT
+from .vectorized import (
+    UNASSIGNED, aligned_assignments, assignment_array, capacity_vector, demand_matrix,
+    pack_vms, repair_vec, solution_from_assignment
+)
 
 
 def calculate_fitness(solution: Solution) -> float:
@@ -15,20 +24,22 @@ def calculate_fitness(solution: Solution) -> float:
     Goal: Minimize servers, then maximize utilization
     Uses a more gradual scale to allow improvements
     """
-    if not solution.is_valid():
+    stats = solution_stats(solution)
+    if stats is None:
+        solution.fitness = 10000.0
         return 10000.0
 
-    num_servers = solution.num_servers_used
+    num_servers, util_cpu, util_ram, util_storage = stats
 
     if num_servers == 0:
+        solution.fitness = 0.0
         return 0.0
 
     # Primary: server count (weighted but not overwhelming)
     server_cost = num_servers * 100.0
 
     # Secondary: utilization (inverted - higher util = lower cost)
-    utils = solution.average_utilization
-    avg_util = (utils['cpu'] + utils['ram'] + utils['storage']) / 3.0
+    avg_util = (util_cpu + util_ram + util_storage) / 3.0
 
     # Penalize low utilization (scaled to be comparable to server differences)
     utilization_cost = (100.0 - avg_util) / 10.0  # Range: 0-10
@@ -40,29 +51,9 @@ def calculate_fitness(solution: Solution) -> float:
 
 
 def first_fit_solution(vms: List[VirtualMachine], server_template: Server) -> Solution:
-    """Create a solution using first-fit heuristic."""
-    servers = []
-
-    for vm in vms:
-        placed = False
-        for server in servers:
-            if server.can_fit(vm):
-                server.add_vm(vm)
-                placed = True
-                break
-
-        if not placed:
-            new_server = Server(
-                id=len(servers),
-                max_cpu_cores=server_template.max_cpu_cores,
-                max_ram_gb=server_template.max_ram_gb,
-                max_storage_gb=server_template.max_storage_gb,
-                name=f"Server-{len(servers)}"
-            )
-            new_server.add_vm(vm)
-            servers.append(new_server)
-
-    return Solution(servers=servers)
+    """Create a solution using first-fit heuristic (the shared, possibly compiled, packer)."""
+    assignment, num_servers = pack_vms(vms, server_template, FIRST_FIT)
+    return solution_from_assignment(vms, assignment, num_servers, server_template)
 
 
 def worst_fit_solution(vms: List[VirtualMachine], server_template: Server) -> Solution:
@@ -89,8 +80,7 @@ def worst_fit_solution(vms: List[VirtualMachine], server_template: Server) -> So
                 id=len(servers),
                 max_cpu_cores=server_template.max_cpu_cores,
                 max_ram_gb=server_template.max_ram_gb,
-                max_storage_gb=server_template.max_storage_gb,
-                name=f"Server-{len(servers)}"
+                max_storage_gb=server_template.max_storage_gb
             )
             new_server.add_vm(vm)
             servers.append(new_server)
@@ -111,8 +101,7 @@ def random_placement_solution(vms: List[VirtualMachine], server_template: Server
             id=i,
             max_cpu_cores=server_template.max_cpu_cores,
             max_ram_gb=server_template.max_ram_gb,
-            max_storage_gb=server_template.max_storage_gb,
-            name=f"Server-{i}"
+            max_storage_gb=server_template.max_storage_gb
         ))
 
     # Place VMs randomly
@@ -132,8 +121,7 @@ def random_placement_solution(vms: List[VirtualMachine], server_template: Server
                 id=len(servers),
                 max_cpu_cores=server_template.max_cpu_cores,
                 max_ram_gb=server_template.max_ram_gb,
-                max_storage_gb=server_template.max_storage_gb,
-                name=f"Server-{len(servers)}"
+                max_storage_gb=server_template.max_storage_gb
             )
             new_server.add_vm(vm)
             servers.append(new_server)
@@ -213,107 +201,61 @@ def create_initial_population(vms: List[VirtualMachine],
 def tournament_selection(population: List[Solution], k: int = 3) -> Solution:
     """Select a solution using tournament selection."""
     tournament = random.sample(population, k)
-    return min(tournament, key=lambda s: s.fitness)
+    return min(tournament, key=attrgetter('fitness'))
 
 
-def simple_crossover(parent1: Solution, parent2: Solution) -> Solution:
+def simple_crossover(parent1: Solution, parent2: Solution,
+                     vm_arrays: Optional[VMArrays] = None) -> Solution:
     """
     Simple crossover: take VM assignments from both parents.
     Ensures ALL VMs are included in the child.
-    """
-    # Get VM assignments
-    map1 = parent1.get_vm_assignment()
-    map2 = parent2.get_vm_assignment()
 
-    # Get all VMs
-    all_vm_ids = sorted(set(map1.keys()) | set(map2.keys()))
+    Args:
+        vm_arrays: All VMs of the scenario. When given, the sorted VM list is
+            reused instead of being rebuilt from the parents on every call
+    """
+    # Get VM assignments, as server id per VM in id order
+    if vm_arrays is not None:
+        all_vms = vm_arrays.vms
+        assign1 = assignment_array(parent1, vm_arrays)
+        assign2 = assignment_array(parent2, vm_arrays)
+    else:
+        all_vms, assign1, assign2 = aligned_assignments(parent1, parent2)
 
-    if not all_vm_ids or not parent1.servers:
+    if not all_vms or not parent1.servers:
         return parent1.clone()
 
-    # Collect all VMs (CRITICAL: ensure we have all VMs)
-    all_vms = {}
-    for server in parent1.servers + parent2.servers:
-        for vm in server.vms:
-            all_vms[vm.id] = vm
-
     # Get server template
     template = parent1.servers[0]
-
-    # Create child by randomly choosing from parent assignments
-    child_servers = {}
-    unplaced_vms = []  # Track VMs that couldn't be placed
-
-    for vm_id in all_vm_ids:
-        vm = all_vms.get(vm_id)
-        if not vm:
-            continue
-
-        # Get server IDs from both parents
-        server_id_1 = map1.get(vm_id)
-        server_id_2 = map2.get(vm_id)
-
-        # Filter out None values
-        valid_options = [s for s in [server_id_1, server_id_2] if s is not None]
-
-        if not valid_options:
-            # Neither parent has this VM (shouldn't happen, but handle it)
-            unplaced_vms.append(vm)
-            continue
-
-        # Randomly choose assignment from valid options
-        server_id = random.choice(valid_options)
-
-        # Create server if needed
-        if server_id not in child_servers:
-            child_servers[server_id] = Server(
-                id=server_id,
-                max_cpu_cores=template.max_cpu_cores,
-                max_ram_gb=template.max_ram_gb,
-                max_storage_gb=template.max_storage_gb,
-                name=f"Server-{server_id}"
-            )
-
-        server = child_servers[server_id]
-
-        # Try to add, if it doesn't fit we'll repair later
-        if not server.can_fit(vm):
-            unplaced_vms.append(vm)
-        else:
-            server.add_vm(vm)
-
-    # REPAIR: Place any unplaced VMs
-    server_list = list(child_servers.values())
-    for vm in unplaced_vms:
-        placed = False
-        # Try existing servers first
-        for server in server_list:
-            if server.can_fit(vm):
-                server.add_vm(vm)
-                placed = True
-                break
-
-        # Create new server if needed
-        if not placed:
-            new_id = max([s.id for s in server_list], default=-1) + 1
-            new_server = Server(
-                id=new_id,
-                max_cpu_cores=template.max_cpu_cores,
-                max_ram_gb=template.max_ram_gb,
-                max_storage_gb=template.max_storage_gb,
-                name=f"Server-{new_id}"
-            )
-            new_server.add_vm(vm)
-            server_list.append(new_server)
-
-    child = Solution(servers=server_list)
-
-    # VALIDATION: Ensure all VMs are present
-    if child.total_vms != len(all_vm_ids):
-        # Fallback: if we still lost VMs, return a clone of parent1
+    demand = vm_arrays.demand if vm_arrays is not None else demand_matrix(all_vms)
+    capacity = capacity_vector(template)
+    if (demand > capacity).any():
+        # A VM bigger than an empty server cannot be placed
         return parent1.clone()
 
-    return child
+    # Create child by randomly choosing from parent assignments: one random
+    # bit per VM, falling back to the other parent for VMs missing from one
+    num_vms = len(all_vms)
+    num_bytes = (num_vms + 7) // 8
+    bits = random.getrandbits(8 * num_bytes).to_bytes(num_bytes, 'little')
+    take_first = np.unpackbits(np.frombuffer(bits, dtype=np.uint8), count=num_vms,
+                               bitorder='little').astype(bool)
+    chosen = np.where(take_first, assign1, assign2)
+    chosen = np.where(chosen == UNASSIGNED, np.where(take_first, assign2, assign1), chosen)
+
+    # VMs that don't fit their chosen server (or are in neither parent) are
+    # repaired First-Fit, opening new servers as needed
+    server_ids, members = repair_vec(chosen, demand, capacity)
+    return Solution(servers=[
+        Server(
+            id=server_id,
+            max_cpu_cores=template.max_cpu_cores,
+            max_ram_gb=template.max_ram_gb,
+            max_storage_gb=template.max_storage_gb,
+            vms=[all_vms[i] for i in indices]
+        )
+        for server_id, indices in zip(server_ids, members)
+    ])
 
 
 def consolidation_mutation(solution: Solution) -> Solution:
@@ -351,6 +293,8 @@ def consolidation_mutation(solution: Solution) -> Solution:
                 if remaining < min_remaining:
                     min_remaining = remaining
                     best_server = target
+                    if remaining <= 0:
+                        break  # perfect fit
 
         if best_server:
             source.remove_vm(vm)
@@ -428,6 +372,8 @@ def run_simple_ga(vms: List[VirtualMachine],
 
     # Create initial population
     population = create_initial_population(vms, server_template, population_size, quality=initial_quality)
+    vm_arrays = VMArrays.from_vms(vms)
+    tournament = TournamentSelection(k=3)
 
     # Evaluate initial population
     for sol in population:
@@ -473,9 +419,9 @@ def run_simple_ga(vms: List[VirtualMachine],
         # Create next generation
         new_population = []
 
-        # Elitism
+        # Elitism (no copy needed: operators clone before modifying)
         for i in range(elitism_count):
-            elite = population[i].clone()
+            elite = population[i]
             elite.generation = gen + 1
             new_population.append(elite)
 
@@ -484,12 +430,15 @@ def run_simple_ga(vms: List[VirtualMachine],
         if stagnation > 10:
             current_mutation_rate = min(0.7, mutation_rate * (1 + stagnation / 20))
 
-        # Crossover and mutation
+        # Crossover and mutation, with the tournaments for every parent of
+        # this generation run in one batch
+        parents = iter(tournament.select_many(population,
+                                              2 * (population_size - len(new_population))))
         while len(new_population) < population_size:
-            parent1 = tournament_selection(population, k=3)
-            parent2 = tournament_selection(population, k=3)
+            parent1 = next(parents)
+            parent2 = next(parents)
 
-            child = simple_crossover(parent1, parent2)
+            child = simple_crossover(parent1, parent2, vm_arrays)
             child = simple_mutation(child, current_mutation_rate)
 
             child.generation = gen + 1
@@ -499,9 +448,11 @@ def run_simple_ga(vms: List[VirtualMachine],
 
         population = new_population
 
-    # Final evaluation
+    # Final evaluation: every child was scored when it was made and elites
+    # keep their fitness, so only score what has none
     for sol in population:
-        calculate_fitness(sol)
+        if sol.fitness is None:
+            calculate_fitness(sol)
 
     population.sort(key=lambda s: s.fitness)
     best_solution = population[0]
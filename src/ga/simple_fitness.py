@@ -3,8 +3,13 @@ A concrete fitness evaluator for the Vector Packing problem.
 This class *implements* the abstract FitnessEvaluator.
 """
 
+from itertools import chain
+from typing import List
+import numpy as np
 from .fitness import FitnessEvaluator  # <-- Imports the template
 from ..models.solution import Solution
+from ._codegen import solution_stats
+from ._packing_numba import HAS_NUMBA, population_fitness
 
 # Define a very large penalty for invalid solutions
 INVALID_PENALTY = 1_000_000.0
@@ -29,11 +34,13 @@ class SimpleFitnessEvaluator(FitnessEvaluator):
         """
         
         # --- 1. Validity Check (The "Must-Have") ---
-        if not solution.is_valid():
+        # (validity and utilization come from one specialized pass)
+        stats = solution_stats(solution)
+        if stats is None:
             solution.fitness = INVALID_PENALTY
             return INVALID_PENALTY
         
-        num_servers = solution.num_servers_used
+        num_servers, util_cpu, util_ram, util_storage = stats
         
         if num_servers == 0:
             solution.fitness = 0.0
@@ -44,17 +51,16 @@ class SimpleFitnessEvaluator(FitnessEvaluator):
 
         # --- 3. Secondary Goal: Maximize Utilization ---
         # Penalize waste more significantly to encourage better packing
-        utils = solution.average_utilization
-        avg_util = (utils['cpu'] + utils['ram'] + utils['storage']) / 3.0
+        avg_util = (util_cpu + util_ram + util_storage) / 3.0
         
         # Convert utilization percentage to a cost (100% util = 0 cost, 0% util = 100 cost)
         waste_cost = (100.0 - avg_util)
 
         # --- 4. Balance Penalty: Penalize unbalanced resource usage ---
         # Encourage balanced usage of CPU, RAM, and storage
-        util_variance = ((utils['cpu'] - avg_util)**2 + 
-                        (utils['ram'] - avg_util)**2 + 
-                        (utils['storage'] - avg_util)**2) / 3.0
+        util_variance = ((util_cpu - avg_util)**2 + 
+                        (util_ram - avg_util)**2 + 
+                        (util_storage - avg_util)**2) / 3.0
         balance_penalty = util_variance * 0.1
 
         total_cost = primary_cost + waste_cost + balance_penalty
@@ -62,6 +68,44 @@ class SimpleFitnessEvaluator(FitnessEvaluator):
         solution.fitness = total_cost
         return total_cost
         
+    def evaluate_population(self, population: List[Solution]) -> List[float]:
+        """
+        Evaluate a whole population, setting sol.fitness on each solution.
+
+        This is the engine's single entry point for scoring a generation.
+        With Numba, the running sums of all servers are stacked once and
+        scored by one parallel kernel; otherwise (or for servers of mixed
+        capacity) each solution goes through evaluate().
+        """
+        if HAS_NUMBA and population:
+            fitness = self._evaluate_compiled(population)
+            if fitness is not None:
+                for solution, value in zip(population, fitness):
+                    solution.fitness = value
+                return fitness
+        return [self.evaluate(solution) for solution in population]
+
+    @staticmethod
+    def _evaluate_compiled(population: List[Solution]):
+        """Fitness of every solution from the compiled kernel, or None for mixed capacities."""
+        used_servers = [[server for server in solution.servers if server.vms]
+                        for solution in population]
+        servers = list(chain.from_iterable(used_servers))
+        if not servers:
+            return [0.0] * len(population)
+        first = servers[0]
+        if any(server._capacity_class != first._capacity_class for server in servers):
+            return None
+
+        used = np.fromiter(
+            chain.from_iterable((s._used_cpu, s._used_ram, s._used_storage) for s in servers),
+            dtype=np.float64, count=3 * len(servers)).reshape(-1, 3)
+        offsets = np.zeros(len(population) + 1, dtype=np.int64)
+        np.cumsum([len(group) for group in used_servers], out=offsets[1:])
+        capacity = np.array([first.max_cpu_cores, first.max_ram_gb, first.max_storage_gb],
+                            dtype=np.float64)
+        return population_fitness(used, offsets, capacity, INVALID_PENALTY).tolist()
+
     def compare_solutions(self, sol1: Solution, sol2: Solution) -> int:
         """
         Compare two solutions (lower fitness is better).
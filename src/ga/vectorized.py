@@ -0,0 +1,303 @@
+"""
+Vectorized helpers for the integer assignment-array representation.
+
+A chromosome can be flattened to an int array where `assignment[i]` is the
+server id of VM i (or UNASSIGNED), with the VM demands stacked into a
+(num_vms, 3) float array of (cpu, ram, storage). Operators can then work on
+whole chromosomes with NumPy and only build Server objects at the end.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from ..models import VirtualMachine, Server, Solution, VMArrays
+from ._packing_numba import BEST_FIT, FIRST_FIT, HAS_NUMBA, pack, repair_first_fit
+
+# Marker for a VM that has no server in an assignment array
+UNASSIGNED = -1
+
+
+def demand_matrix(vms: Sequence) -> np.ndarray:
+    """Stack VM requirements into a (num_vms, 3) array of (cpu, ram, storage)."""
+    return np.array([vm.resource_vector for vm in vms], dtype=np.float64).reshape(-1, 3)
+
+
+def capacity_vector(server) -> np.ndarray:
+    """Capacity of a server as a (cpu, ram, storage) array."""
+    return np.array([server.max_cpu_cores, server.max_ram_gb, server.max_storage_gb],
+                    dtype=np.float64)
+
+
+def solution_arrays(solution) -> Tuple[list, np.ndarray, np.ndarray]:
+    """Flatten a solution into (vms, vm ids, server id of each VM), in server order."""
+    servers = solution.servers
+    vms = [vm for server in servers for vm in server.vms]
+    vm_ids = np.fromiter((vm.id for vm in vms), dtype=np.int64, count=len(vms))
+    server_ids = np.repeat(np.array([server.id for server in servers], dtype=np.int64),
+                           [len(server.vms) for server in servers])
+    return vms, vm_ids, server_ids
+
+
+def assignment_array(solution, vm_arrays: VMArrays) -> np.ndarray:
+    """
+    Server id of each VM of `vm_arrays` in a solution (UNASSIGNED if missing).
+
+    The (read-only) array is cached on the solution, keyed by the stamps of
+    its servers, so parents drawn again, and clones nobody has changed since,
+    skip the rebuild.
+    """
+    key = tuple((server.id, server._stamp) for server in solution.servers)
+    cached = getattr(solution, '_assignment_cache', None)
+    if cached is not None and cached[0] is vm_arrays and cached[1] == key:
+        return cached[2]
+
+    _, ids, server_ids = solution_arrays(solution)
+    assignment = np.full(len(vm_arrays), UNASSIGNED, dtype=np.int64)
+    assignment[vm_arrays.index_of(ids)] = server_ids
+    assignment.flags.writeable = False
+    solution._assignment_cache = (vm_arrays, key, assignment)
+    return assignment
+
+
+def aligned_assignments(solution1, solution2) -> Tuple[list, np.ndarray, np.ndarray]:
+    """
+    Assignment arrays of two solutions over the sorted union of their VM ids.
+
+    Returns:
+        (vms, assignment1, assignment2): the VM objects in id order and the
+        server id of each VM in either solution (UNASSIGNED if missing)
+    """
+    vms1, ids1, servers1 = solution_arrays(solution1)
+    vms2, ids2, servers2 = solution_arrays(solution2)
+    all_ids = np.union1d(ids1, ids2)
+
+    pos1 = np.searchsorted(all_ids, ids1)
+    pos2 = np.searchsorted(all_ids, ids2)
+    assignment1 = np.full(len(all_ids), UNASSIGNED, dtype=np.int64)
+    assignment2 = np.full(len(all_ids), UNASSIGNED, dtype=np.int64)
+    assignment1[pos1] = servers1
+    assignment2[pos2] = servers2
+
+    # VM object per id, taken from the second solution when both have it
+    source = np.empty(len(all_ids), dtype=np.int64)
+    source[pos1] = np.arange(len(vms1))
+    source[pos2] = np.arange(len(vms1), len(vms1) + len(vms2))
+    all_vms = vms1 + vms2
+    return [all_vms[i] for i in source], assignment1, assignment2
+
+
+def crossover_vec(parent1: np.ndarray, parent2: np.ndarray,
+                  cut: int) -> Tuple[np.ndarray, np.ndarray]:
+    """One-point crossover of two assignment arrays at position `cut`."""
+    child1 = np.concatenate((parent1[:cut], parent2[cut:]))
+    child2 = np.concatenate((parent2[:cut], parent1[cut:]))
+    return child1, child2
+
+
+def repair_vec(assignment: np.ndarray, demand: np.ndarray,
+               capacity: np.ndarray) -> Tuple[List[int], List[np.ndarray]]:
+    """
+    Turn an assignment array into a feasible packing.
+
+    VMs stay on their assigned server, in index order, as long as they fit.
+    VMs that overflow their server (or are unassigned) are then placed
+    First-Fit into the servers in order of first appearance, opening new
+    servers when nothing fits.
+
+    Args:
+        assignment: Server id per VM, UNASSIGNED for none
+        demand: (num_vms, 3) VM requirements
+        capacity: (cpu, ram, storage) capacity of every server
+
+    Returns:
+        (server_ids, members): id of every non-empty server, and for each
+        one the indices of its VMs in placement order
+    """
+    num_vms = len(assignment)
+    assigned = np.flatnonzero(assignment != UNASSIGNED)
+
+    # Compact server indices, numbered in order of first appearance
+    raw_ids, first_seen, inverse = np.unique(assignment[assigned],
+                                             return_index=True, return_inverse=True)
+    appearance = np.argsort(first_seen)
+    rank = np.empty_like(appearance)
+    rank[appearance] = np.arange(len(appearance))
+
+    server_of = np.full(num_vms, UNASSIGNED, dtype=np.int64)
+    server_of[assigned] = rank[inverse.ravel()]
+    server_ids = raw_ids[appearance].tolist()
+    num_servers = len(server_ids)
+
+    if HAS_NUMBA:
+        unplaced, total = repair_first_fit(server_of, num_servers, demand, capacity)
+        next_id = max(server_ids, default=-1) + 1
+        server_ids.extend(range(next_id, next_id + total - num_servers))
+        num_servers = total
+    else:
+        unplaced, num_servers = _repair_first_fit(server_of, server_ids, demand, capacity)
+
+    # Group VMs per server: original members in index order, then repaired ones
+    order_key = server_of * (2 * num_vms) + unplaced * num_vms + np.arange(num_vms)
+    order = np.argsort(order_key)
+    counts = np.bincount(server_of, minlength=num_servers)
+    members = np.split(order, np.cumsum(counts)[:-1])
+
+    keep = [s for s in range(num_servers) if counts[s] > 0]
+    return [server_ids[s] for s in keep], [members[s] for s in keep]
+
+
+def _repair_first_fit(server_of: np.ndarray, server_ids: List[int], demand: np.ndarray,
+                      capacity: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    NumPy version of _packing_numba.repair_first_fit for when Numba is not
+    installed. Updates `server_of` in place and appends the ids of new
+    servers to `server_ids`.
+    """
+    num_vms = len(server_of)
+    num_servers = len(server_ids)
+    assigned = np.flatnonzero(server_of != UNASSIGNED)
+
+    # Room for every server that repair could possibly open
+    used = np.zeros((num_servers + num_vms, 3))
+    for dim in range(3):
+        used[:num_servers, dim] = np.bincount(server_of[assigned],
+                                              weights=demand[assigned, dim],
+                                              minlength=num_servers)
+
+    # Servers over capacity keep their VMs greedily in index order
+    unplaced = server_of == UNASSIGNED
+    cap_cpu, cap_ram, cap_storage = capacity.tolist()
+    for server in np.flatnonzero((used[:num_servers] > capacity).any(axis=1)):
+        cpu = ram = storage = 0.0
+        for i in np.flatnonzero(server_of == server):
+            vm_cpu, vm_ram, vm_storage = demand[i].tolist()
+            if (cap_cpu - cpu >= vm_cpu and cap_ram - ram >= vm_ram and
+                    cap_storage - storage >= vm_storage):
+                cpu += vm_cpu
+                ram += vm_ram
+                storage += vm_storage
+            else:
+                unplaced[i] = True
+                server_of[i] = UNASSIGNED
+        used[server] = (cpu, ram, storage)
+
+    # REPAIR: First-Fit everything left over. max_free is an upper bound on
+    # the free capacity of any server (it may be stale-high, never low), so
+    # a VM exceeding it opens a new server without scanning.
+    repaired = np.flatnonzero(unplaced)
+    next_id = max(server_ids, default=-1) + 1
+    max_free = (capacity - used[:num_servers]).max(axis=0, initial=0.0)
+    for i in repaired:
+        need = demand[i]
+        server = None
+        if (need <= max_free).all():
+            free = capacity - used[:num_servers]
+            fits = np.flatnonzero((free >= need).all(axis=1))
+            if fits.size:
+                server = fits[0]
+            else:
+                max_free = free.max(axis=0, initial=0.0)
+        if server is None:
+            server = num_servers
+            num_servers += 1
+            server_ids.append(next_id)
+            next_id += 1
+            max_free = np.maximum(max_free, capacity - need)
+        used[server] += need
+        server_of[i] = server
+
+    return unplaced, num_servers
+
+
+def pack_vms(vms: List[VirtualMachine], server_template: Server, mode: int,
+             demand: Optional[np.ndarray] = None):
+    """
+    Place VMs, in order, into identical servers with the given rule
+    (FIRST_FIT, BEST_FIT or WORST_FIT). `demand` is demand_matrix(vms),
+    if the caller already has it.
+
+    Server usage is kept as three parallel lists (one per resource) instead
+    of Server objects, so the scan over open servers is plain float
+    arithmetic. The checks and running sums match Server.can_fit/add_vm.
+    With Numba installed the compiled `pack` kernel is used instead.
+
+    Returns:
+        (assignment, num_servers): server index per VM (-1 if a VM does not
+        fit even an empty server) and the number of servers opened
+    """
+    if HAS_NUMBA:
+        if demand is None:
+            demand = demand_matrix(vms)
+        assignment, num_servers = pack(demand, capacity_vector(server_template), mode)
+        return assignment.tolist(), num_servers
+
+    cap_cpu = server_template.max_cpu_cores
+    cap_ram = server_template.max_ram_gb
+    cap_storage = server_template.max_storage_gb
+    used_cpu, used_ram, used_storage = [], [], []
+    assignment = []
+
+    for vm in vms:
+        cpu, ram, storage = vm.cpu_cores, vm.ram_gb, vm.storage_gb
+        target = -1
+        if mode == FIRST_FIT:
+            for s in range(len(used_cpu)):
+                if (cap_cpu - used_cpu[s] >= cpu and cap_ram - used_ram[s] >= ram and
+                        cap_storage - used_storage[s] >= storage):
+                    target = s
+                    break
+        else:
+            # Best-Fit takes the least remaining capacity, Worst-Fit the most
+            best_remaining = float('inf') if mode == BEST_FIT else -1
+            for s in range(len(used_cpu)):
+                free_cpu = cap_cpu - used_cpu[s]
+                free_ram = cap_ram - used_ram[s]
+                free_storage = cap_storage - used_storage[s]
+                if free_cpu >= cpu and free_ram >= ram and free_storage >= storage:
+                    remaining = (free_cpu - cpu + (free_ram - ram) / 10 +
+                                 (free_storage - storage) / 100)
+                    if (remaining < best_remaining if mode == BEST_FIT
+                            else remaining > best_remaining):
+                        best_remaining = remaining
+                        target = s
+                        # Nothing beats a perfect fit (remaining is never negative)
+                        if mode == BEST_FIT and remaining <= 0:
+                            break
+
+        if target < 0:
+            # Open a new server, if the VM fits an empty one at all
+            if not (cap_cpu >= cpu and cap_ram >= ram and cap_storage >= storage):
+                assignment.append(-1)
+                continue
+            target = len(used_cpu)
+            used_cpu.append(0)
+            used_ram.append(0)
+            used_storage.append(0)
+        used_cpu[target] += cpu
+        used_ram[target] += ram
+        used_storage[target] += storage
+        assignment.append(target)
+
+    return assignment, len(used_cpu)
+
+
+def solution_from_assignment(vms: List[VirtualMachine], assignment, num_servers: int,
+                             server_template: Server, warn_unplaced: bool = False) -> Solution:
+    """Build the Solution for a server index per VM, one Server per index."""
+    groups = [[] for _ in range(num_servers)]
+    for vm, server_idx in zip(vms, assignment):
+        if server_idx >= 0:
+            groups[server_idx].append(vm)
+        elif warn_unplaced:
+            print(f"Warning: VM {vm.id} could not be placed in a new server.")
+
+    server_pool = [
+        Server(
+            id=server_idx,
+            max_cpu_cores=server_template.max_cpu_cores,
+            max_ram_gb=server_template.max_ram_gb,
+            max_storage_gb=server_template.max_storage_gb,
+            vms=group
+        )
+        for server_idx, group in enumerate(groups)
+    ]
+    return Solution(servers=server_pool)
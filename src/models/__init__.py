@@ -5,5 +5,6 @@ Core data models for the Vector Packing Problem
 from .virtual_machine import VirtualMachine
 from .server import Server
 from .solution import Solution
+from .vm_arrays import VMArrays
 
-__all__ = ['VirtualMachine', 'Server', 'Solution']
+__all__ = ['VirtualMachine', 'Server', 'Solution', 'VMArrays']
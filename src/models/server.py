@@ -4,10 +4,24 @@ Represents a bin with maximum capacity constraints
 """
 
 from dataclasses import dataclass, field
+from itertools import count
 from typing import List, Dict, Optional
 from .virtual_machine import VirtualMachine
 
 
+# Small integer per distinct (cpu, ram, storage) capacity, so code that is
+# specialized for one server size can check it with a single comparison
+_capacity_classes: Dict[tuple, int] = {}
+
+# Source of Server._stamp values, never reused within a process
+_stamps = count()
+
+
+def _capacity_class(capacity: tuple) -> int:
+    """Capacity class number of a (cpu, ram, storage) capacity in this process"""
+    return _capacity_classes.setdefault(capacity, len(_capacity_classes))
+
+
 @dataclass
 class Server:
     """
@@ -31,21 +45,36 @@ class Server:
     def __post_init__(self):
         if not self.name:
             self.name = f"Server-{self.id}"
+        self._capacity_class = _capacity_class(
+            (self.max_cpu_cores, self.max_ram_gb, self.max_storage_gb))
+        # Resource usage is kept up to date by add_vm/remove_vm/clear. One
+        # pass, accumulated in the same order as add_vm would
+        used_cpu = used_ram = used_storage = 0
+        for vm in self.vms:
+            used_cpu += vm.cpu_cores
+            used_ram += vm.ram_gb
+            used_storage += vm.storage_gb
+        self._used_cpu = used_cpu
+        self._used_ram = used_ram
+        self._used_storage = used_storage
+        # Renewed whenever the set of VMs changes; copies share it until then,
+        # so two servers with the same stamp hold the same VMs
+        self._stamp = next(_stamps)
     
     @property
     def used_cpu(self) -> float:
-        """Calculate total CPU cores used"""
-        return sum(vm.cpu_cores for vm in self.vms)
+        """Total CPU cores used"""
+        return self._used_cpu
     
     @property
     def used_ram(self) -> float:
-        """Calculate total RAM used in GB"""
-        return sum(vm.ram_gb for vm in self.vms)
+        """Total RAM used in GB"""
+        return self._used_ram
     
     @property
     def used_storage(self) -> float:
-        """Calculate total storage used in GB"""
-        return sum(vm.storage_gb for vm in self.vms)
+        """Total storage used in GB"""
+        return self._used_storage
     
     @property
     def available_cpu(self) -> float:
@@ -87,9 +116,32 @@ class Server:
         Returns:
             True if VM can fit, False otherwise
         """
-        return (self.available_cpu >= vm.cpu_cores and
-                self.available_ram >= vm.ram_gb and
-                self.available_storage >= vm.storage_gb)
+        return (self.max_cpu_cores - self._used_cpu >= vm.cpu_cores and
+                self.max_ram_gb - self._used_ram >= vm.ram_gb and
+                self.max_storage_gb - self._used_storage >= vm.storage_gb)
+    
+    def can_swap(self, vm_out: VirtualMachine, vm_in: VirtualMachine) -> bool:
+        """
+        Check if a VM would fit after removing one of this server's VMs,
+        without changing the server
+        
+        Args:
+            vm_out: VirtualMachine on this server that would be removed
+            vm_in: VirtualMachine that would be added
+            
+        Returns:
+            True if vm_in fits in place of vm_out, False otherwise
+        """
+        if len(self.vms) == 1:
+            used_cpu = used_ram = used_storage = 0
+        else:
+            # Same arithmetic as remove_vm
+            used_cpu = self._used_cpu - vm_out.cpu_cores
+            used_ram = self._used_ram - vm_out.ram_gb
+            used_storage = self._used_storage - vm_out.storage_gb
+        return (self.max_cpu_cores - used_cpu >= vm_in.cpu_cores and
+                self.max_ram_gb - used_ram >= vm_in.ram_gb and
+                self.max_storage_gb - used_storage >= vm_in.storage_gb)
     
     def add_vm(self, vm: VirtualMachine) -> bool:
         """
@@ -103,6 +155,10 @@ class Server:
         """
         if self.can_fit(vm):
             self.vms.append(vm)
+            self._used_cpu += vm.cpu_cores
+            self._used_ram += vm.ram_gb
+            self._used_storage += vm.storage_gb
+            self._stamp = next(_stamps)
             return True
         return False
     
@@ -116,14 +172,51 @@ class Server:
         Returns:
             True if VM was removed, False if not found
         """
-        if vm in self.vms:
+        # One scan of the VM list instead of a membership test and a remove
+        try:
             self.vms.remove(vm)
-            return True
-        return False
-    
+        except ValueError:
+            return False
+        if self.vms:
+            self._used_cpu -= vm.cpu_cores
+            self._used_ram -= vm.ram_gb
+            self._used_storage -= vm.storage_gb
+        else:
+            # Drop any rounding drift once the server is empty
+            self._used_cpu = self._used_ram = self._used_storage = 0
+        self._stamp = next(_stamps)
+        return True
+    
+    def copy(self) -> 'Server':
+        """
+        Copy of this server with its own VM list.
+        The VM objects themselves are shared, since they are never modified.
+        """
+        clone = object.__new__(Server)
+        clone.__dict__.update(self.__dict__)
+        clone.vms = self.vms.copy()
+        return clone
+
+    def __setstate__(self, state: Dict):
+        """
+        Unpickle a server, e.g. one sent back by a pool worker. Capacity
+        classes and stamps are numbered per process, so both are assigned
+        again here instead of being taken over from the sender.
+        """
+        self.__dict__.update(state)
+        self._capacity_class = _capacity_class(
+            (self.max_cpu_cores, self.max_ram_gb, self.max_storage_gb))
+        self._stamp = next(_stamps)
+
+    def restore(self, snapshot: 'Server'):
+        """Put this server back to the state saved in `snapshot` (a copy() of it)"""
+        self.__dict__.update(snapshot.__dict__)
+
     def clear(self):
         """Remove all VMs from this server"""
         self.vms.clear()
+        self._used_cpu = self._used_ram = self._used_storage = 0
+        self._stamp = next(_stamps)
     
     def __repr__(self) -> str:
         return (f"Server({self.name}: "
@@ -56,16 +56,35 @@ class Solution:
         Returns:
             True if valid, False otherwise
         """
+        # Reads the running sums directly, like Server.can_fit
         for server in self.servers:
-            if (server.used_cpu > server.max_cpu_cores or
-                server.used_ram > server.max_ram_gb or
-                server.used_storage > server.max_storage_gb):
+            if (server._used_cpu > server.max_cpu_cores or
+                server._used_ram > server.max_ram_gb or
+                server._used_storage > server.max_storage_gb):
                 return False
         return True
     
     def clone(self) -> 'Solution':
-        """Create a deep copy of this solution"""
-        return copy.deepcopy(self)
+        """
+        Create a copy of this solution that can be modified independently.
+        Servers and their VM lists are copied; VM objects are shared.
+        """
+        clone = Solution(
+            servers=[server.copy() for server in self.servers],
+            fitness=self.fitness,
+            generation=self.generation,
+            metadata=copy.deepcopy(self.metadata) if self.metadata else {}
+        )
+        # The copied servers keep their stamps, so a cached assignment
+        # array stays valid for the clone until one of them changes
+        clone._assignment_cache = getattr(self, '_assignment_cache', None)
+        return clone
+    
+    def __getstate__(self) -> Dict:
+        """Pickle without the cached assignment array (and the VMArrays it references)"""
+        state = self.__dict__.copy()
+        state.pop('_assignment_cache', None)
+        return state
     
     def get_vm_assignment(self) -> Dict[int, int]:
         """
@@ -4,14 +4,18 @@ Represents an item to be packed with resource requirements
 """
 
 from dataclasses import dataclass
+from functools import cached_property
 from typing import Dict
 
 
-@dataclass
+@dataclass(eq=False)
 class VirtualMachine:
     """
     Represents a Virtual Machine with resource requirements.
     
+    VMs compare by identity, so looking one up in a server's VM list is a
+    pointer scan rather than a field-by-field comparison.
+    
     Attributes:
         id: Unique identifier for the VM
         cpu_cores: Number of CPU cores required
@@ -33,11 +37,20 @@ class VirtualMachine:
         if not self.name:
             self.name = f"VM-{self.id}"
     
-    @property
+    @cached_property
     def resource_vector(self) -> tuple:
-        """Returns the resource requirements as a vector"""
+        """Returns the resource requirements as a vector (cached, see composite_score)"""
         return (self.cpu_cores, self.ram_gb, self.storage_gb)
     
+    @cached_property
+    def composite_score(self) -> float:
+        """
+        Total resource demand (cpu + ram/10 + storage/100), used to sort VMs
+        largest or smallest first. Computed once, as VM requirements do not
+        change after creation.
+        """
+        return self.cpu_cores + self.ram_gb/10 + self.storage_gb/100
+    
     def __repr__(self) -> str:
         return f"VM({self.name}: CPU={self.cpu_cores}, RAM={self.ram_gb}GB, Storage={self.storage_gb}GB)"
     
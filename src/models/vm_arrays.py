@@ -0,0 +1,59 @@
+"""
+VM Arrays Model
+Structure-of-arrays view of a set of VMs for vectorized code
+"""
+
+from dataclasses import dataclass
+from typing import List, Sequence
+import numpy as np
+from .virtual_machine import VirtualMachine
+
+
+@dataclass
+class VMArrays:
+    """
+    The demands of a set of VMs as parallel NumPy arrays (SoA), sorted by id.
+
+    Index i of every array refers to the same VM, so packing code can work
+    on compact VM indices instead of VirtualMachine objects.
+
+    Attributes:
+        vms: The VMs, sorted by id
+        ids: VM ids (int64)
+        demand: (num_vms, 3) float64 requirements as (cpu, ram, storage)
+    """
+    vms: List[VirtualMachine]
+    ids: np.ndarray
+    demand: np.ndarray
+
+    @classmethod
+    def from_vms(cls, vms: Sequence[VirtualMachine]) -> 'VMArrays':
+        """Build the arrays for a list of VMs"""
+        vms = sorted(vms, key=lambda vm: vm.id)
+        return cls(
+            vms=vms,
+            ids=np.array([vm.id for vm in vms], dtype=np.int64),
+            demand=np.array([vm.resource_vector for vm in vms], dtype=np.float64).reshape(-1, 3)
+        )
+
+    @property
+    def cpu(self) -> np.ndarray:
+        """CPU cores required per VM"""
+        return self.demand[:, 0]
+
+    @property
+    def ram(self) -> np.ndarray:
+        """RAM required per VM in GB"""
+        return self.demand[:, 1]
+
+    @property
+    def storage(self) -> np.ndarray:
+        """Storage required per VM in GB"""
+        return self.demand[:, 2]
+
+    def index_of(self, vm_ids) -> np.ndarray:
+        """Compact indices of the given VM ids"""
+        return np.searchsorted(self.ids, vm_ids)
+
+    def __len__(self) -> int:
+        return len(self.vms)
@@ -9,12 +9,67 @@ Source: https://github.com/Azure/AzurePublicDataset
 Paper: Protean: VM Allocation Service at Scale (OSDI 2020)
 """
 
+import multiprocessing
 import sqlite3
 import random
-from typing import List, Dict, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
+from typing import List, Dict, Tuple, Optional, Sequence
 from pathlib import Path
+import numpy as np
 from ..models import VirtualMachine, Server
 
+# Rows per fetchmany() batch when streaming active VMs into an array
+_FETCH_BATCH = 50000
+
+
+def _scale_vm_types(vm_types: Dict[int, Dict[str, float]], server_template: Server,
+                    storage_key: str) -> Dict[int, tuple]:
+    """
+    Scale every VM type's fractions to a server template, once per type.
+
+    Returns:
+        {vmTypeId: (cpu_cores, ram_gb, storage_gb, metadata)}, leaving out
+        types with a zero resource (edge case), whose VMs are skipped
+    """
+    scaled_types = {}
+    for vm_type_id, vm_type in vm_types.items():
+        # Convert fractional resources to actual values
+        cpu_cores = vm_type['core'] * server_template.max_cpu_cores
+        ram_gb = vm_type['memory'] * server_template.max_ram_gb
+        storage_gb = vm_type[storage_key] * server_template.max_storage_gb
+
+        if cpu_cores == 0 or ram_gb == 0 or storage_gb == 0:
+            continue
+
+        scaled_types[vm_type_id] = (cpu_cores, ram_gb, storage_gb, {
+            'vm_type_id': vm_type_id,
+            'source': 'azure_packing_trace_2020',
+            'fractional_core': vm_type['core'],
+            'fractional_memory': vm_type['memory'],
+            'fractional_ssd': vm_type['ssd'],
+            'fractional_hdd': vm_type['hdd']
+        })
+    return scaled_types
+
+
+def _sample(items: Sequence, num_samples: int, seed: Optional[int]) -> Sequence:
+    """Random subset of `items`, or all of them if there are no more than num_samples"""
+    if seed is not None:
+        random.seed(seed)
+
+    if len(items) <= num_samples:
+        return items
+    return random.sample(items, num_samples)
+
+
+def _renumber(vms: List[VirtualMachine]):
+    """Renumber IDs sequentially for consistency"""
+    for i, vm in enumerate(vms):
+        vm.id = i
+        vm.name = f"Azure-VM-{i}"
+
 
 class AzureDataLoader:
     """
@@ -32,9 +87,25 @@ class AzureDataLoader:
             db_path: Path to packing_trace_zone_a_v1.sqlite file
         """
         self.db_path = db_path
+        self._vm_types_cache: Optional[Dict[int, Dict[str, float]]] = None
         if not Path(db_path).exists():
             raise FileNotFoundError(f"Database not found: {db_path}")
 
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open the trace for reading.
+
+        The loader never writes, so the file is opened read-only and
+        immutable, which skips SQLite's file locking and change detection,
+        and is read through mmap with a large page cache.
+        """
+        uri = Path(self.db_path).resolve().as_uri() + '?mode=ro&immutable=1'
+        conn = sqlite3.connect(uri, uri=True)
+        conn.execute("PRAGMA mmap_size = 268435456")  # 256 MB
+        conn.execute("PRAGMA cache_size = -131072")  # 128 MB
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
     def get_database_stats(self) -> Dict:
         """
         Get statistics about the Azure dataset.
@@ -42,30 +113,25 @@ class AzureDataLoader:
         Returns:
             Dictionary with dataset statistics
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         stats = {}
 
-        # Total VM requests
-        cursor.execute("SELECT COUNT(*) FROM vm")
-        stats['total_vm_requests'] = cursor.fetchone()[0]
-
-        # Total VM types
-        cursor.execute("SELECT COUNT(DISTINCT vmTypeId) FROM vmType")
-        stats['total_vm_types'] = cursor.fetchone()[0]
-
-        # Active VMs at time 0 (VMs with starttime <= 0 and (endtime > 0 or endtime is NULL))
+        # Totals, VMs active at time 0 (starttime <= 0 and (endtime > 0 or
+        # endtime is NULL)) and the time range, in one pass over vm
         cursor.execute("""
-            SELECT COUNT(*)
+            SELECT COUNT(*),
+                   COALESCE(SUM(starttime <= 0 AND (endtime > 0 OR endtime IS NULL)), 0),
+                   MIN(starttime),
+                   MAX(starttime),
+                   (SELECT COUNT(DISTINCT vmTypeId) FROM vmType)
             FROM vm
-            WHERE starttime <= 0 AND (endtime > 0 OR endtime IS NULL)
         """)
-        stats['active_vms_at_time_0'] = cursor.fetchone()[0]
-
-        # Time range
-        cursor.execute("SELECT MIN(starttime), MAX(starttime) FROM vm WHERE starttime IS NOT NULL")
-        min_time, max_time = cursor.fetchone()
+        total, active, min_time, max_time, num_types = cursor.fetchone()
+        stats['total_vm_requests'] = total
+        stats['total_vm_types'] = num_types
+        stats['active_vms_at_time_0'] = active
         stats['time_range_hours'] = (min_time, max_time)
 
         # Priority distribution
@@ -79,11 +145,17 @@ class AzureDataLoader:
         """
         Load all VM types with their fractional resource requirements.
 
+        The vmType table never changes, so it is read once per loader and
+        the same dictionary is returned afterwards.
+
         Returns:
             Dictionary mapping vmTypeId to resource fractions
             {vmTypeId: {'core': float, 'memory': float, 'ssd': float, 'nic': float}}
         """
-        conn = sqlite3.connect(self.db_path)
+        if self._vm_types_cache is not None:
+            return self._vm_types_cache
+
+        conn = self._connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -104,6 +176,7 @@ class AzureDataLoader:
             }
 
         conn.close()
+        self._vm_types_cache = vm_types
         return vm_types
 
     def load_active_vms_at_time(self,
@@ -119,9 +192,19 @@ class AzureDataLoader:
         Returns:
             List of (vmId, vmTypeId) tuples
         """
-        conn = sqlite3.connect(self.db_path)
+        query, params = self._active_vms_query(time_point, priority)
+
+        conn = self._connect()
         cursor = conn.cursor()
+        cursor.execute(query, params)
+        active_vms = cursor.fetchall()
 
+        conn.close()
+        return active_vms
+
+    def _active_vms_query(self, time_point: float,
+                          priority: Optional[int]) -> Tuple[str, list]:
+        """SQL and parameters selecting (vmId, vmTypeId) of the active VMs"""
         query = """
             SELECT vmId, vmTypeId
             FROM vm
@@ -134,11 +217,33 @@ class AzureDataLoader:
             query += " AND priority = ?"
             params.append(priority)
 
-        cursor.execute(query, params)
-        active_vms = cursor.fetchall()
+        return query, params
+
+    def _load_active_vm_array(self, time_point: float,
+                              priority: Optional[int]) -> np.ndarray:
+        """
+        Active VMs as an (n, 2) int64 array of (vmId, vmTypeId) rows.
+
+        Rows are fetched in batches and packed into NumPy as they arrive, so
+        the active part of the trace never sits in memory as Python tuples.
+        VMs without a type are left out, as they never convert.
+        """
+        query, params = self._active_vms_query(time_point, priority)
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.arraysize = _FETCH_BATCH
+        cursor.execute(query + " AND vmTypeId IS NOT NULL", params)
+
+        batches = [np.empty((0, 2), dtype=np.int64)]
+        rows = cursor.fetchmany()
+        while rows:
+            flat = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=2 * len(rows))
+            batches.append(flat.reshape(-1, 2))
+            rows = cursor.fetchmany()
 
         conn.close()
-        return active_vms
+        return np.concatenate(batches)
 
     def convert_to_virtual_machines(self,
                                     vm_list: List[Tuple[int, int]],
@@ -161,35 +266,22 @@ class AzureDataLoader:
 
         storage_key = 'ssd' if use_storage_as_ssd else 'hdd'
 
-        for vm_id, vm_type_id in vm_list:
-            if vm_type_id not in vm_types:
-                continue
-
-            vm_type = vm_types[vm_type_id]
+        # Scale each VM type once rather than once per VM
+        scaled_types = _scale_vm_types(vm_types, server_template, storage_key)
 
-            # Convert fractional resources to actual values
-            cpu_cores = vm_type['core'] * server_template.max_cpu_cores
-            ram_gb = vm_type['memory'] * server_template.max_ram_gb
-            storage_gb = vm_type[storage_key] * server_template.max_storage_gb
-
-            # Skip VMs with zero resources (edge case)
-            if cpu_cores == 0 or ram_gb == 0 or storage_gb == 0:
+        for vm_id, vm_type_id in vm_list:
+            scaled = scaled_types.get(vm_type_id)
+            if scaled is None:
                 continue
 
+            cpu_cores, ram_gb, storage_gb, metadata = scaled
             vm = VirtualMachine(
                 id=vm_id,
                 cpu_cores=cpu_cores,
                 ram_gb=ram_gb,
                 storage_gb=storage_gb,
                 name=f"Azure-VM-{vm_id}",
-                metadata={
-                    'vm_type_id': vm_type_id,
-                    'source': 'azure_packing_trace_2020',
-                    'fractional_core': vm_type['core'],
-                    'fractional_memory': vm_type['memory'],
-                    'fractional_ssd': vm_type['ssd'],
-                    'fractional_hdd': vm_type['hdd']
-                }
+                metadata=metadata.copy()
             )
             virtual_machines.append(vm)
 
@@ -210,18 +302,8 @@ class AzureDataLoader:
         Returns:
             Sampled list of VMs with renumbered IDs
         """
-        if seed is not None:
-            random.seed(seed)
-
-        if len(vms) <= num_samples:
-            sampled = vms
-        else:
-            sampled = random.sample(vms, num_samples)
-
-        # Renumber IDs sequentially for consistency
-        for i, vm in enumerate(sampled):
-            vm.id = i
-            vm.name = f"Azure-VM-{i}"
+        sampled = _sample(vms, num_samples, seed)
+        _renumber(sampled)
 
         return sampled
 
@@ -310,18 +392,21 @@ class AzureDataLoader:
         vm_types = self.load_vm_types()
 
         # Load active VMs at the specified time
-        active_vm_list = self.load_active_vms_at_time(time_point, priority)
+        active_vms = self._load_active_vm_array(time_point, priority)
 
-        # Convert to VirtualMachine objects
-        all_vms = self.convert_to_virtual_machines(
-            active_vm_list,
+        # Sample the VMs whose type converts, and build VirtualMachine
+        # objects only for the sampled ones
+        storage_key = 'ssd' if use_storage_as_ssd else 'hdd'
+        scaled_types = _scale_vm_types(vm_types, server_template, storage_key)
+        vm_pool = active_vms[np.isin(active_vms[:, 1], list(scaled_types))]
+        picked = list(_sample(range(len(vm_pool)), config['num_vms'], seed))
+        sampled_vms = self.convert_to_virtual_machines(
+            vm_pool[picked].tolist(),
             vm_types,
             server_template,
             use_storage_as_ssd
         )
-
-        # Sample to desired size
-        sampled_vms = self.sample_vms(all_vms, config['num_vms'], seed)
+        _renumber(sampled_vms)
 
         return {
             'vms': sampled_vms,
@@ -332,32 +417,38 @@ class AzureDataLoader:
                 'source': 'Azure Packing Trace 2020',
                 'time_point': time_point,
                 'priority_filter': priority,
-                'original_pool_size': len(all_vms),
+                'original_pool_size': len(vm_pool),
                 'storage_dimension': 'ssd' if use_storage_as_ssd else 'hdd'
             }
         }
 
     def generate_multiple_scenarios(self,
-                                    seed: Optional[int] = None) -> Dict[str, Dict]:
+                                    seed: Optional[int] = None,
+                                    n_workers: Optional[int] = None) -> Dict[str, Dict]:
         """
         Generate all four scenario sizes at once.
 
         Args:
             seed: Random seed for reproducibility
+            n_workers: Generate the sizes in this many worker processes, each
+                       with its own SQLite connection. With a seed the
+                       scenarios are the same as when generated in sequence.
 
         Returns:
             Dictionary mapping scenario names to scenario data
         """
-        scenarios = {}
-
-        for size in ['small', 'medium', 'large', 'extra_large']:
-            scenarios[size] = self.generate_scenario_from_azure(
-                scenario_size=size,
-                time_point=0.0,
-                seed=seed
-            )
-
-        return scenarios
+        sizes = ['small', 'medium', 'large', 'extra_large']
+        generate = partial(self.generate_scenario_from_azure, time_point=0.0, seed=seed)
+
+        if n_workers is not None and n_workers > 1:
+            # Load the VM types once here; workers get them with the loader
+            self.load_vm_types()
+            # spawn: forking after Numba has started its threads is unsafe
+            with ProcessPoolExecutor(max_workers=min(n_workers, len(sizes)),
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                return dict(zip(sizes, executor.map(generate, sizes)))
+
+        return {size: generate(size) for size in sizes}
 
     def print_statistics(self):
         """Print detailed statistics about the dataset."""
@@ -6,6 +6,7 @@ new solutions that leverage successful VM groupings.
 """
 
 import random
+from operator import attrgetter
 from typing import List, Set
 from ..models import VirtualMachine, Server, Solution
 from .crowd_analyzer import CrowdAnalyzer
@@ -51,10 +52,10 @@ class CrowdBuilder:
             random.shuffle(remaining_vms)  # Random order
         elif ordering_strategy < 0.66:
             # Sort by largest first
-            remaining_vms.sort(key=lambda v: v.cpu_cores + v.ram_gb/10 + v.storage_gb/100, reverse=True)
+            remaining_vms.sort(key=attrgetter('composite_score'), reverse=True)
         else:
             # Sort by smallest first
-            remaining_vms.sort(key=lambda v: v.cpu_cores + v.ram_gb/10 + v.storage_gb/100)
+            remaining_vms.sort(key=attrgetter('composite_score'))
         
         solution = Solution(servers=[], generation=0, metadata={'method': 'crowd_wisdom'})
         
@@ -64,8 +65,7 @@ class CrowdBuilder:
                 id=len(solution.servers),
                 max_cpu_cores=server_template.max_cpu_cores,
                 max_ram_gb=server_template.max_ram_gb,
-                max_storage_gb=server_template.max_storage_gb,
-                name=f"Server-{len(solution.servers)}"
+                max_storage_gb=server_template.max_storage_gb
             )
             
             # Try to fill this server using affinity guidance
@@ -0,0 +1,157 @@
+"""
+Unit tests for the Azure data loader on a small synthetic trace
+"""
+
+import random
+import sqlite3
+import pytest
+from src.models import Server
+from src.utils import AzureDataLoader
+from src.utils import azure_data_loader
+
+
+@pytest.fixture
+def trace_db(tmp_path):
+    """Build a SQLite file with the schema of the Azure packing trace"""
+    rng = random.Random(0)
+    path = tmp_path / 'trace.sqlite'
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE vmType (id INTEGER, vmTypeId INTEGER, machineId INTEGER, "
+                 "core REAL, memory REAL, hdd REAL, ssd REAL, nic REAL)")
+    conn.execute("CREATE TABLE vm (vmId INTEGER, tenantId INTEGER, vmTypeId INTEGER, "
+                 "priority INTEGER, starttime REAL, endtime REAL)")
+
+    # One row per (type, machine) as in the trace. Type 11 has no SSD, some
+    # VMs use type 12, which has no row at all, and some have no type
+    num_types = 12
+    rows = []
+    for machine in range(3):
+        for t in range(num_types):
+            rows.append((num_types * machine + t, t, machine, rng.uniform(0.01, 0.3),
+                         rng.uniform(0.01, 0.3), rng.uniform(0.01, 0.2),
+                         None if t == 11 else rng.uniform(0.01, 0.2), rng.uniform(0.01, 0.1)))
+    conn.executemany("INSERT INTO vmType VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    vms = []
+    for vm_id in range(400):
+        start = rng.uniform(-5.0, 5.0)
+        end = None if rng.random() < 0.3 else start + rng.uniform(0.5, 10.0)
+        vm_type = None if vm_id % 50 == 0 else rng.randrange(num_types + 1)
+        vms.append((vm_id, rng.randrange(20), vm_type, rng.randrange(2), start, end))
+    conn.executemany("INSERT INTO vm VALUES (?, ?, ?, ?, ?, ?)", vms)
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def vm_key(vms):
+    """Comparable summary of a list of VMs"""
+    return [(vm.id, vm.name, vm.cpu_cores, vm.ram_gb, vm.storage_gb, vm.metadata)
+            for vm in vms]
+
+
+class TestAzureDataLoader:
+    """Test cases for AzureDataLoader"""
+
+    def test_generate_scenario(self, trace_db):
+        """Test that scenarios hold active VMs scaled to the server template"""
+        scenario = AzureDataLoader(trace_db).generate_scenario_from_azure('small', seed=1)
+        template = scenario['server_template']
+        assert scenario['num_vms'] == 20
+        assert [vm.id for vm in scenario['vms']] == list(range(20))
+        for vm in scenario['vms']:
+            assert vm.cpu_cores == vm.metadata['fractional_core'] * template.max_cpu_cores
+
+    def test_multiple_scenarios_in_workers(self, trace_db):
+        """Test that worker processes generate the same scenarios as a sequential run"""
+        loader = AzureDataLoader(trace_db)
+        sequential = loader.generate_multiple_scenarios(seed=3)
+        parallel = loader.generate_multiple_scenarios(seed=3, n_workers=2)
+        assert list(parallel) == ['small', 'medium', 'large', 'extra_large']
+        for size in sequential:
+            assert vm_key(parallel[size]['vms']) == vm_key(sequential[size]['vms'])
+
+    def test_vm_types_cached(self, trace_db):
+        """Test that VM types are read from the database only once"""
+        loader = AzureDataLoader(trace_db)
+        vm_types = loader.load_vm_types()
+        assert len(vm_types) == 12
+
+        conn = sqlite3.connect(trace_db)
+        conn.execute("DELETE FROM vmType")
+        conn.commit()
+        conn.close()
+        assert loader.load_vm_types() is vm_types
+        assert AzureDataLoader(trace_db).load_vm_types() == {}
+
+    @pytest.mark.parametrize('use_ssd', [True, False])
+    def test_convert_to_virtual_machines(self, trace_db, use_ssd):
+        """Test scaling, skipped VM types and per-VM metadata"""
+        loader = AzureDataLoader(trace_db)
+        template = Server(id=0, max_cpu_cores=64, max_ram_gb=256, max_storage_gb=2000)
+        vm_types = loader.load_vm_types()
+        active = loader.load_active_vms_at_time(1.0)
+        vms = loader.convert_to_virtual_machines(active, vm_types, template, use_ssd)
+
+        storage_key = 'ssd' if use_ssd else 'hdd'
+        kept = [(vm_id, t) for vm_id, t in active
+                if t in vm_types and vm_types[t][storage_key] > 0]
+        assert [(vm.id, vm.metadata['vm_type_id']) for vm in vms] == kept
+        assert any(t == 11 for _, t in kept) != use_ssd
+        for vm in vms:
+            vm_type = vm_types[vm.metadata['vm_type_id']]
+            assert vm.cpu_cores == vm_type['core'] * template.max_cpu_cores
+            assert vm.storage_gb == vm_type[storage_key] * template.max_storage_gb
+            assert vm.metadata['fractional_hdd'] == vm_type['hdd']
+        assert len({id(vm.metadata) for vm in vms}) == len(vms)
+
+    def test_scenario_matches_converting_whole_pool(self, trace_db):
+        """Test that sampling before building VMs picks the same VMs as before"""
+        loader = AzureDataLoader(trace_db)
+        scenario = loader.generate_scenario_from_azure('small', time_point=1.0, seed=4)
+
+        all_vms = loader.convert_to_virtual_machines(
+            loader.load_active_vms_at_time(1.0), loader.load_vm_types(),
+            scenario['server_template'])
+        expected = loader.sample_vms(all_vms, 20, seed=4)
+        assert vm_key(scenario['vms']) == vm_key(expected)
+        assert scenario['metadata']['original_pool_size'] == len(all_vms)
+
+    def test_active_vm_array(self, trace_db, monkeypatch):
+        """Test that the batched array holds the typed rows of the plain query"""
+        monkeypatch.setattr(azure_data_loader, '_FETCH_BATCH', 7)
+        loader = AzureDataLoader(trace_db)
+        rows = loader.load_active_vms_at_time(1.0, 0)
+        expected = [row for row in rows if row[1] is not None]
+        assert len(expected) < len(rows)
+
+        active = loader._load_active_vm_array(1.0, 0)
+        assert active.dtype == 'int64'
+        assert [tuple(row) for row in active.tolist()] == expected
+
+    def test_connect_read_only(self, trace_db, tmp_path):
+        """Test that the trace is opened read-only, also from awkward paths"""
+        odd_path = tmp_path / 'trace #1 50%.sqlite'
+        odd_path.write_bytes(open(trace_db, 'rb').read())
+        loader = AzureDataLoader(str(odd_path))
+        assert len(loader.load_vm_types()) == 12
+
+        conn = loader._connect()
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM vm")
+        conn.close()
+
+    def test_database_stats(self, trace_db):
+        """Test the fused statistics query against one query per statistic"""
+        stats = AzureDataLoader(trace_db).get_database_stats()
+
+        conn = sqlite3.connect(trace_db)
+        count = lambda query: conn.execute(query).fetchone()[0]
+        assert stats['total_vm_requests'] == count("SELECT COUNT(*) FROM vm") == 400
+        assert stats['total_vm_types'] == count("SELECT COUNT(DISTINCT vmTypeId) FROM vmType")
+        assert stats['active_vms_at_time_0'] == count(
+            "SELECT COUNT(*) FROM vm WHERE starttime <= 0 AND (endtime > 0 OR endtime IS NULL)")
+        assert stats['time_range_hours'] == conn.execute(
+            "SELECT MIN(starttime), MAX(starttime) FROM vm").fetchone()
+        assert sum(stats['priority_distribution'].values()) == 400
+        conn.close()
@@ -0,0 +1,59 @@
+"""
+Unit tests for the convergence capture benchmark script
+"""
+
+import random
+from scripts.benchmarks import capture_convergence_data as ccd
+from src.ga.simple_engine import first_fit_solution
+from src.utils.data_generator import DataGenerator
+
+
+class TestMakeChild:
+    """Test cases for building offspring in-process"""
+
+    def test_leaves_global_rng_alone(self):
+        """Test that the per-child seed does not replace the caller's RNG state"""
+        scenario = DataGenerator.generate_scenario('small', seed=1)
+        vms, template = scenario['vms'], scenario['server_template']
+        ccd._init_scenario(vms)
+        rng = random.Random(1)
+        parents = [first_fit_solution(rng.sample(vms, len(vms)), template) for _ in range(2)]
+
+        random.seed(9)
+        expected = [random.random() for _ in range(3)]
+        random.seed(9)
+        child = ccd._make_child(*parents, True, 123)
+        assert [random.random() for _ in range(3)] == expected
+
+        again = ccd._make_child(*parents, True, 123)
+        assert again.get_vm_assignment() == child.get_vm_assignment()
+
+    def test_children_need_no_repair(self):
+        """Test that children are valid and complete, as _make_child skips repair"""
+        scenario = DataGenerator.generate_scenario('medium', seed=2)
+        vms, template = scenario['vms'], scenario['server_template']
+        ccd._init_scenario(vms)
+        rng = random.Random(2)
+        for seed in range(30):
+            parents = [first_fit_solution(rng.sample(vms, len(vms)), template)
+                       for _ in range(2)]
+            child = ccd._make_child(*parents, seed % 2 == 0, seed)
+            assert child.total_vms == len(vms)
+            assert set(child.get_vm_assignment()) == {vm.id for vm in vms}
+            assert child.is_valid()
+            assert child.fitness is not None
+
+
+class TestRunGAWithTracking:
+    """Test cases for run_ga_with_tracking"""
+
+    def test_reproducible_without_seed(self):
+        """Test that seeding the global RNG makes unseeded runs repeat"""
+        histories = []
+        for _ in range(2):
+            scenario = DataGenerator.generate_scenario('small', seed=42)
+            _, history = ccd.run_ga_with_tracking(scenario['vms'], scenario['server_template'],
+                                                  population_size=10, generations=5,
+                                                  max_workers=1)
+            histories.append(history)
+        assert histories[0] == histories[1]
@@ -0,0 +1,110 @@
+"""
+Unit tests for the fitness evaluation helpers
+"""
+
+import random
+import numpy as np
+from src.models import VirtualMachine, Server, Solution
+from src.ga._codegen import solution_stats
+from src.ga.engine import create_initial_population
+from src.ga.simple_engine import calculate_fitness
+from src.ga.simple_fitness import SimpleFitnessEvaluator, INVALID_PENALTY
+from src.utils.data_generator import DataGenerator
+
+
+def make_server(server_id, cpu=16, ram=64, storage=500):
+    return Server(id=server_id, max_cpu_cores=cpu, max_ram_gb=ram, max_storage_gb=storage)
+
+
+class TestSolutionStats:
+    """Test cases for the specialized validity/utilization pass"""
+
+    def test_matches_solution_properties(self):
+        """Test that stats agree with is_valid and average_utilization"""
+        s1, s2, s3 = make_server(0), make_server(1), make_server(2)
+        s1.add_vm(VirtualMachine(id=1, cpu_cores=4, ram_gb=16, storage_gb=100))
+        s1.add_vm(VirtualMachine(id=2, cpu_cores=3.5, ram_gb=8, storage_gb=20))
+        s2.add_vm(VirtualMachine(id=3, cpu_cores=7, ram_gb=30, storage_gb=333))
+        solution = Solution(servers=[s1, s2, s3])
+
+        utils = solution.average_utilization
+        assert solution_stats(solution) == (2, utils['cpu'], utils['ram'], utils['storage'])
+
+    def test_invalid_solution(self):
+        """Test that an over-capacity server makes the stats None"""
+        server = Server(id=0, max_cpu_cores=4, max_ram_gb=64, max_storage_gb=500,
+                        vms=[VirtualMachine(id=1, cpu_cores=8, ram_gb=1, storage_gb=1)])
+        assert solution_stats(Solution(servers=[server])) is None
+
+    def test_mixed_capacities_and_empty(self):
+        """Test the fallback for mixed server sizes and empty solutions"""
+        small, big = make_server(0), make_server(1, cpu=64, ram=256, storage=2000)
+        small.add_vm(VirtualMachine(id=1, cpu_cores=8, ram_gb=32, storage_gb=250))
+        big.add_vm(VirtualMachine(id=2, cpu_cores=8, ram_gb=32, storage_gb=250))
+        solution = Solution(servers=[small, big])
+
+        utils = solution.average_utilization
+        assert solution_stats(solution) == (2, utils['cpu'], utils['ram'], utils['storage'])
+        assert solution_stats(Solution()) == (0, 0.0, 0.0, 0.0)
+
+    def test_numpy_and_infinite_capacities(self):
+        """Test capacities whose repr is not a plain literal"""
+        for cpu in (np.float64(16), float('inf')):
+            server = make_server(0, cpu=cpu, ram=np.float64(64))
+            server.add_vm(VirtualMachine(id=1, cpu_cores=4, ram_gb=16, storage_gb=100))
+            solution = Solution(servers=[server])
+
+            utils = solution.average_utilization
+            assert solution_stats(solution) == (1, utils['cpu'], utils['ram'], utils['storage'])
+            assert np.isfinite(calculate_fitness(solution))
+            assert np.isfinite(SimpleFitnessEvaluator().evaluate(solution))
+
+
+class TestEvaluatePopulation:
+    """Test cases for batch fitness evaluation"""
+
+    def check_batch(self, scenario_name, seed, size, template_overload):
+        """
+        Batch-evaluate a scenario's initial population plus an empty and an
+        overloaded solution, and compare with evaluate() on each solution.
+        The overloaded server has the template capacity if template_overload,
+        otherwise a 1/1/1 capacity of its own.
+        """
+        random.seed(seed)
+        scenario = DataGenerator.generate_scenario(scenario_name, seed=seed)
+        template = scenario['server_template']
+        population = create_initial_population(scenario['vms'], template, size)
+        cpu, ram, storage = ((template.max_cpu_cores, template.max_ram_gb,
+                              template.max_storage_gb) if template_overload else (1, 1, 1))
+        overloaded = Server(id=0, max_cpu_cores=cpu, max_ram_gb=ram, max_storage_gb=storage,
+                            vms=[VirtualMachine(id=1, cpu_cores=cpu + 1, ram_gb=1, storage_gb=1)])
+        population += [Solution(), Solution(servers=[overloaded])]
+
+        evaluator = SimpleFitnessEvaluator()
+        expected = [evaluator.evaluate(sol) for sol in population]
+        for sol in population:
+            sol.fitness = None
+
+        assert evaluator.evaluate_population(population) == expected
+        assert [sol.fitness for sol in population] == expected
+        assert expected[-2:] == [0.0, INVALID_PENALTY]
+
+    def test_matches_single_evaluation(self):
+        """Test that batch fitness equals evaluate() with mixed server capacities"""
+        self.check_batch('medium', 5, 12, template_overload=False)
+
+    def test_shared_capacity_population(self):
+        """Test batch fitness when every server has the template capacity"""
+        self.check_batch('small', 6, 6, template_overload=True)
+
+
+class TestCalculateFitness:
+    """Test cases for simple_engine.calculate_fitness"""
+
+    def test_sets_fitness_on_every_path(self):
+        """Test that empty and invalid solutions get their fitness stored too"""
+        overloaded = Server(id=0, max_cpu_cores=1, max_ram_gb=1, max_storage_gb=1,
+                            vms=[VirtualMachine(id=1, cpu_cores=2, ram_gb=1, storage_gb=1)])
+        empty, invalid = Solution(), Solution(servers=[overloaded])
+        assert calculate_fitness(empty) == empty.fitness == 0.0
+        assert calculate_fitness(invalid) == invalid.fitness == 10000.0
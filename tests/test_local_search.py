@@ -0,0 +1,103 @@
+"""
+Unit tests for the local search improvement step
+"""
+
+import random
+import pytest
+from src.models import VirtualMachine, Server, Solution
+from src.ga.local_search import local_search_improvement
+from src.ga.simple_engine import random_placement_solution
+from src.utils.data_generator import DataGenerator
+
+
+def layout(solution):
+    return [(s.id, [vm.id for vm in s.vms]) for s in solution.servers]
+
+
+class TestLocalSearch:
+    """Test cases for local_search_improvement"""
+
+    def test_consolidates_into_fewer_servers(self):
+        """Test that a VM alone on a server is moved onto another one"""
+        vms = [VirtualMachine(id=i, cpu_cores=2, ram_gb=4, storage_gb=10) for i in range(3)]
+        solution = Solution(servers=[
+            Server(id=0, max_cpu_cores=16, max_ram_gb=64, max_storage_gb=500, vms=vms[:2]),
+            Server(id=1, max_cpu_cores=16, max_ram_gb=64, max_storage_gb=500, vms=vms[2:]),
+        ])
+        improved = local_search_improvement(solution)
+        assert improved.num_servers_used == 1
+        assert layout(solution) == [(0, [0, 1]), (1, [2])]
+
+    def test_failed_moves_leave_no_trace(self):
+        """Test that rejected moves are undone and the input is never modified"""
+        from src.ga.simple_fitness import SimpleFitnessEvaluator
+
+        scenario = DataGenerator.generate_scenario('small', seed=4)
+        random.seed(4)
+        evaluator = SimpleFitnessEvaluator()
+        for _ in range(10):
+            solution = random_placement_solution(scenario['vms'], scenario['server_template'])
+            before = layout(solution)
+            improved = local_search_improvement(solution)
+            assert layout(solution) == before
+            assert improved.is_valid()
+            assert improved.fitness == evaluator.evaluate(improved.clone())
+            assert improved.fitness <= evaluator.evaluate(solution)
+
+    def test_process_pool_gives_same_results(self):
+        """Test that local searches on a spawn process pool, as run_ga builds it, change nothing"""
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from src.ga.engine import _local_search_many
+        from src.ga.simple_fitness import SimpleFitnessEvaluator
+
+        scenario = DataGenerator.generate_scenario('small', seed=5)
+        template = scenario['server_template']
+        random.seed(5)
+        population = [random_placement_solution(scenario['vms'], template) for _ in range(6)]
+        expected = _local_search_many(population, 5)
+        with ProcessPoolExecutor(max_workers=2,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = _local_search_many(population, 5, executor)
+        assert [layout(sol) for sol in results] == [layout(sol) for sol in expected]
+
+        # Servers coming back from the workers are numbered for this process
+        local = Server(id=0, max_cpu_cores=template.max_cpu_cores,
+                       max_ram_gb=template.max_ram_gb, max_storage_gb=template.max_storage_gb)
+        servers = [server for sol in results for server in sol.servers]
+        assert all(server._capacity_class == local._capacity_class for server in servers)
+        sent = {(server.id, server._stamp) for sol in population for server in sol.servers}
+        assert not sent & {(server.id, server._stamp) for server in servers}
+
+        fitness = [sol.fitness for sol in results]
+        for sol in results:
+            sol.fitness = None
+        evaluator = SimpleFitnessEvaluator()
+        assert evaluator.evaluate_population(results) == fitness
+        assert evaluator._evaluate_compiled(results) in (None, fitness)
+
+    def test_run_ga_shuts_pool_down_on_error(self, monkeypatch):
+        """Test that run_ga's local-search pool is shut down if the loop raises"""
+        from src.ga import engine
+
+        pools = []
+
+        class RecordingPool:
+            def __init__(self, max_workers, mp_context):
+                self.is_shut_down = False
+                pools.append(self)
+
+            def shutdown(self):
+                self.is_shut_down = True
+
+        def failing_search(solutions, max_iterations, executor=None):
+            raise RuntimeError("local search failed")
+
+        monkeypatch.setattr(engine, 'ProcessPoolExecutor', RecordingPool)
+        monkeypatch.setattr(engine, '_local_search_many', failing_search)
+        scenario = DataGenerator.generate_scenario('small', seed=6)
+        random.seed(6)
+        with pytest.raises(RuntimeError):
+            engine.run_ga(scenario['vms'], scenario['server_template'], population_size=10,
+                          generations=20, use_local_search=True, local_search_workers=2)
+        assert len(pools) == 1 and pools[0].is_shut_down
@@ -3,7 +3,7 @@ Unit tests for data models
 """
 
 import pytest
-from src.models import VirtualMachine, Server, Solution
+from src.models import VirtualMachine, Server, Solution, VMArrays
 
 
 class TestVirtualMachine:
@@ -22,6 +22,13 @@ class TestVirtualMachine:
         """Test resource vector property"""
         vm = VirtualMachine(id=1, cpu_cores=4, ram_gb=16, storage_gb=100)
         assert vm.resource_vector == (4, 16, 100)
+        assert vm.resource_vector is vm.resource_vector
+    
+    def test_composite_score(self):
+        """Test the cached total demand used for sorting"""
+        vm = VirtualMachine(id=1, cpu_cores=4, ram_gb=16, storage_gb=100)
+        assert vm.composite_score == 4 + 16/10 + 100/100
+        assert 'composite_score' not in vm.to_dict()
     
     def test_vm_to_dict(self):
         """Test VM serialization"""
@@ -100,6 +107,93 @@ class TestServer:
         server.remove_vm(vm)
         assert len(server.vms) == 0
 
+    def test_server_remove_vm_by_identity(self):
+        """Test that removal matches the VM object, not an equal-looking copy"""
+        server = Server(id=1, max_cpu_cores=16, max_ram_gb=64, max_storage_gb=500)
+        vm = VirtualMachine(id=1, cpu_cores=4, ram_gb=16, storage_gb=100)
+        twin = VirtualMachine(id=1, cpu_cores=4, ram_gb=16, storage_gb=100)
+        server.add_vm(vm)
+
+        assert vm != twin
+        assert not server.remove_vm(twin)
+        assert server.remove_vm(vm)
+        assert server.vms == []
+
+    def test_can_fit_exact_fit(self):
+        """Test that a VM filling the remaining capacity exactly still fits"""
+        server = Server(id=1, max_cpu_cores=16, max_ram_gb=64, max_storage_gb=500)
+        assert server.add_vm(VirtualMachine(id=1, cpu_cores=12, ram_gb=48, storage_gb=375))
+        assert server.add_vm(VirtualMachine(id=2, cpu_cores=4, ram_gb=16, storage_gb=125))
+        assert not server.can_fit(VirtualMachine(id=3, cpu_cores=0.1, ram_gb=0, storage_gb=0))
+
+    def test_can_fit_matches_exact_check(self):
+        """Test that can_fit agrees with the available capacity after adds and removes"""
+        import random
+        rng = random.Random(3)
+        for _ in range(200):
+            server = Server(id=1, max_cpu_cores=32, max_ram_gb=128, max_storage_gb=1000)
+            for i in range(rng.randint(0, 8)):
+                server.add_vm(VirtualMachine(id=i, cpu_cores=rng.uniform(0, 8),
+                                             ram_gb=rng.uniform(0, 32),
+                                             storage_gb=rng.uniform(0, 250)))
+            if server.vms and rng.random() < 0.5:
+                server.remove_vm(rng.choice(server.vms))
+            vm = VirtualMachine(id=99, cpu_cores=rng.uniform(0, 12),
+                                ram_gb=rng.uniform(0, 48), storage_gb=rng.uniform(0, 400))
+            exact = (server.available_cpu >= vm.cpu_cores and
+                     server.available_ram >= vm.ram_gb and
+                     server.available_storage >= vm.storage_gb)
+            assert server.can_fit(vm) == exact
+
+    def test_can_swap_matches_remove_then_fit(self):
+        """Test that can_swap agrees with removing the VM and calling can_fit"""
+        import random
+        rng = random.Random(5)
+        for _ in range(200):
+            server = Server(id=1, max_cpu_cores=32, max_ram_gb=128, max_storage_gb=1000)
+            for i in range(rng.randint(1, 8)):
+                server.add_vm(VirtualMachine(id=i, cpu_cores=rng.uniform(0, 8),
+                                             ram_gb=rng.uniform(0, 32),
+                                             storage_gb=rng.uniform(0, 250)))
+            vm_out = rng.choice(server.vms)
+            vm_in = VirtualMachine(id=99, cpu_cores=rng.uniform(0, 12),
+                                   ram_gb=rng.uniform(0, 48), storage_gb=rng.uniform(0, 400))
+            expected = server.copy()
+            expected.remove_vm(vm_out)
+            assert server.can_swap(vm_out, vm_in) == expected.can_fit(vm_in)
+
+    def test_restore_snapshot(self):
+        """Test that restore() undoes changes made after copy()"""
+        vms = [VirtualMachine(id=i, cpu_cores=2, ram_gb=4, storage_gb=10) for i in range(3)]
+        server = Server(id=1, max_cpu_cores=16, max_ram_gb=64, max_storage_gb=500, vms=vms[:2])
+        snapshot = server.copy()
+        server.remove_vm(vms[0])
+        server.add_vm(vms[2])
+        server.restore(snapshot)
+        assert server.vms == vms[:2]
+        assert (server.used_cpu, server.used_ram, server.used_storage) == (4, 8, 20)
+        assert server._stamp == snapshot._stamp
+
+    def test_unpickle_renumbers_process_local_ids(self):
+        """Test that unpickled servers get this process's capacity class and a new stamp"""
+        import pickle
+        vm = VirtualMachine(id=1, cpu_cores=2, ram_gb=4, storage_gb=10)
+        server = Server(id=1, max_cpu_cores=16, max_ram_gb=64, max_storage_gb=500, vms=[vm])
+        state = server.__dict__.copy()
+        # As numbered by some other process
+        state['_capacity_class'] = server._capacity_class + 1000
+        state['_stamp'] = server._stamp
+
+        restored = Server.__new__(Server)
+        restored.__setstate__(state)
+        assert restored._capacity_class == server._capacity_class
+        assert restored._stamp > server._stamp
+        assert restored.used_cpu == 2
+
+        copied = pickle.loads(pickle.dumps(server))
+        assert copied._capacity_class == server._capacity_class
+        assert copied._stamp != server._stamp
+
 
 class TestSolution:
     """Test cases for Solution class"""
@@ -144,6 +238,12 @@ class TestSolution:
         cloned = solution.clone()
         assert cloned is not solution
         assert len(cloned.servers) == len(solution.servers)
+
+        # The copy can be changed without touching the original
+        cloned.servers[0].remove_vm(vm)
+        assert len(solution.servers[0].vms) == 1
+        assert cloned.servers[0].can_fit(VirtualMachine(id=2, cpu_cores=16, ram_gb=64, storage_gb=500))
+        assert not server.can_fit(VirtualMachine(id=2, cpu_cores=16, ram_gb=64, storage_gb=500))
     
     def test_solution_average_utilization(self):
         """Test average utilization calculation"""
@@ -157,6 +257,36 @@ class TestSolution:
         assert avg_util['cpu'] == 50.0
         assert avg_util['ram'] == 50.0
         assert avg_util['storage'] == 50.0
+    
+    def test_pickle_drops_assignment_cache(self):
+        """Test that pickling leaves out the cached assignment array"""
+        import pickle
+        from src.ga.vectorized import assignment_array
+        vms = [VirtualMachine(id=i, cpu_cores=1, ram_gb=1, storage_gb=1) for i in range(2)]
+        solution = Solution(servers=[Server(id=0, max_cpu_cores=8, max_ram_gb=8,
+                                            max_storage_gb=8, vms=vms)], fitness=3.0)
+        assignment_array(solution, VMArrays.from_vms(vms))
+        restored = pickle.loads(pickle.dumps(solution))
+        assert not hasattr(restored, '_assignment_cache')
+        assert restored.fitness == 3.0
+        assert restored.get_vm_assignment() == solution.get_vm_assignment()
+
+
+class TestVMArrays:
+    """Test cases for the VMArrays SoA view"""
+
+    def test_from_vms_sorts_by_id(self):
+        """Test that arrays are aligned and sorted by VM id"""
+        vms = [VirtualMachine(id=7, cpu_cores=2, ram_gb=4, storage_gb=50),
+               VirtualMachine(id=3, cpu_cores=1, ram_gb=8, storage_gb=20)]
+        arrays = VMArrays.from_vms(vms)
+        assert len(arrays) == 2
+        assert arrays.ids.tolist() == [3, 7]
+        assert [vm.id for vm in arrays.vms] == [3, 7]
+        assert arrays.cpu.tolist() == [1, 2]
+        assert arrays.ram.tolist() == [8, 4]
+        assert arrays.storage.tolist() == [20, 50]
+        assert arrays.index_of([7, 3]).tolist() == [1, 0]
 
 
 if __name__ == '__main__':
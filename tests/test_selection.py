@@ -0,0 +1,115 @@
+"""
+Unit tests for the fitness-based selection operators
+"""
+
+import random
+import pytest
+from src.models import Solution
+from src.ga.advanced_selection import RouletteWheelSelection, RankSelection
+from src.ga.concrete_operators import TournamentSelection
+
+
+def make_population(fitnesses):
+    """Build empty solutions carrying the given fitness values"""
+    return [Solution(servers=[], fitness=f) for f in fitnesses]
+
+
+class TestRouletteWheelSelection:
+    """Test cases for RouletteWheelSelection"""
+
+    def test_prefers_lower_fitness(self):
+        """Test that better (lower) fitness is selected more often"""
+        random.seed(0)
+        population = make_population([10.0, 50.0, 100.0])
+        selection = RouletteWheelSelection()
+        picks = [selection.select(population) for _ in range(3000)]
+        counts = [sum(p is sol for p in picks) for sol in population]
+        assert counts[0] > counts[1] > counts[2] > 0
+
+    def test_select_many(self):
+        """Test batch selection returns members of the population"""
+        random.seed(0)
+        population = make_population([10.0, 50.0, 100.0])
+        selection = RouletteWheelSelection()
+        picks = selection.select_many(population, 500)
+        assert len(picks) == 500
+        assert all(any(p is sol for sol in population) for p in picks)
+        assert sum(p is population[0] for p in picks) > sum(p is population[2] for p in picks)
+
+    def test_equal_fitness_and_repreparing(self):
+        """Test uniform fallback and switching to a new population"""
+        selection = RouletteWheelSelection()
+        population = make_population([5.0, 5.0])
+        assert selection.select(population) in population
+
+        other = make_population([1.0, 1000.0])
+        assert any(selection.select(other) is sol for sol in other)
+
+    def test_empty_population(self):
+        """Test that selecting from an empty population raises"""
+        with pytest.raises(ValueError):
+            RouletteWheelSelection().select([])
+
+    def test_population_changed_in_place(self):
+        """Test that sorting or changing end members of the same list re-prepares"""
+        random.seed(0)
+        population = make_population([1000.0, 10.0, 1000.0])
+        selection = RouletteWheelSelection()
+        selection.select(population)
+
+        population.sort(key=lambda s: s.fitness)
+        picks = selection.select_many(population, 500)
+        assert sum(p is population[0] for p in picks) > 400
+
+        population[0] = Solution(servers=[], fitness=1000.0)
+        population[2].fitness = 10.0
+        picks = [selection.select(population) for _ in range(500)]
+        assert sum(p is population[2] for p in picks) > 400
+
+
+class TestTournamentSelection:
+    """Test cases for TournamentSelection"""
+
+    def test_select_many(self):
+        """Test batch tournaments never pick the k-1 worst solutions"""
+        random.seed(0)
+        population = make_population([40.0, 10.0, 30.0, 20.0, 50.0])
+        picks = TournamentSelection(k=3).select_many(population, 500)
+        assert len(picks) == 500
+        assert not any(p is population[0] or p is population[4] for p in picks)
+        assert sum(p is population[1] for p in picks) > sum(p is population[2] for p in picks)
+
+
+class TestRankSelection:
+    """Test cases for RankSelection"""
+
+    def test_prepare_ranks_population(self):
+        """Test that prepare sorts once and builds cumulative weights"""
+        population = make_population([30.0, 10.0, 20.0])
+        selection = RankSelection(selection_pressure=1.5)
+        selection.prepare(population)
+        assert [s.fitness for s in selection.sorted_pop] == [10.0, 20.0, 30.0]
+        assert selection.cum_weights[-1] == pytest.approx(1.0)
+        assert selection.cum_weights == sorted(selection.cum_weights)
+
+    def test_prefers_better_rank(self):
+        """Test that the best-ranked solution is picked most often"""
+        random.seed(0)
+        population = make_population([30.0, 10.0, 20.0])
+        selection = RankSelection(selection_pressure=2.0)
+        picks = [selection.select(population) for _ in range(3000)]
+        counts = [sum(p is sol for p in picks) for sol in population]
+        assert counts[1] > counts[2] > counts[0]
+
+    def test_population_changed_in_place(self):
+        """Test that select never returns an end member replaced in place"""
+        random.seed(0)
+        population = make_population([30.0, 10.0, 20.0])
+        selection = RankSelection(selection_pressure=2.0)
+        selection.prepare(population)
+
+        removed = population[-1]
+        population[-1] = Solution(servers=[], fitness=5.0)
+        picks = [selection.select(population) for _ in range(300)]
+        assert not any(p is removed for p in picks)
+        assert all(any(p is sol for sol in population) for p in picks)
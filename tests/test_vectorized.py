@@ -0,0 +1,269 @@
+"""
+Unit tests for the vectorized assignment-array helpers
+"""
+
+import random
+import numpy as np
+from src.models import VirtualMachine, Server, Solution, VMArrays
+from src.ga import engine, vectorized
+from src.ga.vectorized import (
+    UNASSIGNED, _repair_first_fit, assignment_array, capacity_vector, crossover_vec,
+    demand_matrix, pack_vms, repair_vec
+)
+from src.ga._packing_numba import pack, repair_first_fit
+from src.ga.concrete_operators import VMMapCrossover
+from src.ga.engine import _calculate_diversity, create_initial_population
+from src.ga.simple_engine import first_fit_solution, simple_crossover
+from src.utils.data_generator import DataGenerator
+
+
+class TestAssignmentArrays:
+    """Test cases for crossover_vec and repair_vec"""
+
+    def test_crossover_vec_swaps_tails(self):
+        """Test one-point crossover of assignment arrays"""
+        p1 = np.array([0, 0, 1, 1])
+        p2 = np.array([5, 6, 7, 8])
+        c1, c2 = crossover_vec(p1, p2, 1)
+        assert c1.tolist() == [0, 6, 7, 8]
+        assert c2.tolist() == [5, 0, 1, 1]
+
+    def test_repair_keeps_feasible_assignment(self):
+        """Test that a feasible assignment is left as is"""
+        demand = np.array([[4, 8, 50], [4, 8, 50], [2, 4, 10]], dtype=float)
+        capacity = np.array([8, 16, 100], dtype=float)
+        server_ids, members = repair_vec(np.array([3, 3, 1]), demand, capacity)
+        assert server_ids == [3, 1]
+        assert [m.tolist() for m in members] == [[0, 1], [2]]
+
+    def test_repair_moves_overflow_and_unassigned(self):
+        """Test that overflowing and unassigned VMs are placed First-Fit"""
+        demand = np.array([[6, 1, 1], [6, 1, 1], [2, 1, 1], [1, 1, 1]], dtype=float)
+        capacity = np.array([8, 16, 100], dtype=float)
+        assignment = np.array([0, 0, 0, UNASSIGNED])
+        server_ids, members = repair_vec(assignment, demand, capacity)
+        # VM 1 overflows server 0 and needs a new server; VM 3 joins it
+        assert server_ids == [0, 1]
+        assert [m.tolist() for m in members] == [[0, 2], [1, 3]]
+        for indices in members:
+            assert (demand[indices].sum(axis=0) <= capacity).all()
+
+    def test_compiled_repair_matches_numpy(self):
+        """Test that the compiled repair step agrees with the NumPy one"""
+        rng = np.random.default_rng(1)
+        demand = rng.integers(1, 9, size=(60, 3)).astype(float)
+        capacity = np.array([16, 16, 16], dtype=float)
+        for _ in range(20):
+            server_of = rng.integers(-1, 6, size=60)
+            expected_of = server_of.copy()
+            expected, total = _repair_first_fit(expected_of, list(range(6)), demand, capacity)
+            unplaced, num_servers = repair_first_fit(server_of, 6, demand, capacity)
+            assert num_servers == total
+            assert unplaced.tolist() == expected.tolist()
+            assert server_of.tolist() == expected_of.tolist()
+
+
+    def test_assignment_array_cache(self):
+        """Test that the cached assignment array follows changes to the servers"""
+        from src.models import VMArrays
+        vms = [VirtualMachine(id=i, cpu_cores=1, ram_gb=1, storage_gb=1) for i in range(3)]
+        s0 = Server(id=0, max_cpu_cores=8, max_ram_gb=8, max_storage_gb=8, vms=vms[:2])
+        s1 = Server(id=4, max_cpu_cores=8, max_ram_gb=8, max_storage_gb=8, vms=vms[2:])
+        solution = Solution(servers=[s0, s1])
+        vm_arrays = VMArrays.from_vms(vms)
+
+        first = assignment_array(solution, vm_arrays)
+        assert first.tolist() == [0, 0, 4]
+        assert assignment_array(solution, vm_arrays) is first
+
+        clone = solution.clone()
+        assert assignment_array(clone, vm_arrays) is first
+        clone.servers[0].remove_vm(vms[1])
+        clone.servers[1].add_vm(vms[1])
+        assert assignment_array(clone, vm_arrays).tolist() == [0, 4, 4]
+        assert assignment_array(solution, vm_arrays) is first
+
+
+class TestVMMapCrossover:
+    """Test cases for the array-based VMMapCrossover"""
+
+    def random_solution(self, vms, template):
+        """First-Fit packing of the VMs in random order"""
+        servers = []
+        for vm in random.sample(vms, len(vms)):
+            for server in servers:
+                if server.add_vm(vm):
+                    break
+            else:
+                server = Server(id=len(servers), max_cpu_cores=template.max_cpu_cores,
+                                max_ram_gb=template.max_ram_gb,
+                                max_storage_gb=template.max_storage_gb)
+                server.add_vm(vm)
+                servers.append(server)
+        return Solution(servers=servers)
+
+    def test_children_are_valid_and_complete(self):
+        """Test that children place every VM exactly once within capacity"""
+        random.seed(7)
+        scenario = DataGenerator.generate_scenario('medium', seed=7)
+        vms = scenario['vms']
+        template = scenario['server_template']
+
+        crossover = VMMapCrossover()
+        for _ in range(20):
+            parents = self.random_solution(vms, template), self.random_solution(vms, template)
+            for child in crossover.crossover(*parents):
+                assert child.is_valid()
+                assert sorted(child.get_vm_assignment()) == sorted(vm.id for vm in vms)
+                ids = [s.id for s in child.servers]
+                assert len(ids) == len(set(ids))
+
+    def test_scenario_vms_given_up_front(self):
+        """Test that passing the scenario VMs gives the same children"""
+        scenario = DataGenerator.generate_scenario('small', seed=3)
+        vms = scenario['vms']
+        template = scenario['server_template']
+        random.seed(3)
+        parents = self.random_solution(vms, template), self.random_solution(vms, template)
+
+        random.seed(11)
+        expected = VMMapCrossover().crossover(*parents)
+        random.seed(11)
+        children = VMMapCrossover(vms, template).crossover(*parents)
+        for child, other in zip(children, expected):
+            assert child.get_vm_assignment() == other.get_vm_assignment()
+
+    def test_oversized_vm_is_still_placed(self):
+        """Test that repair forces a VM bigger than a server into its own server"""
+        random.seed(0)
+        big = VirtualMachine(id=1, cpu_cores=32, ram_gb=8, storage_gb=10)
+        small = VirtualMachine(id=2, cpu_cores=2, ram_gb=8, storage_gb=10)
+        parent = Solution(servers=[
+            Server(id=0, max_cpu_cores=16, max_ram_gb=64, max_storage_gb=500, vms=[big]),
+            Server(id=1, max_cpu_cores=16, max_ram_gb=64, max_storage_gb=500, vms=[small]),
+        ])
+        child1, child2 = VMMapCrossover().crossover(parent, parent.clone())
+        for child in (child1, child2):
+            assert sorted(child.get_vm_assignment()) == [1, 2]
+            assert not child.is_valid()
+
+
+class TestSimpleCrossover:
+    """Test cases for simple_crossover over assignment arrays"""
+
+    def test_scenario_vms_given_up_front(self):
+        """Test that passing the scenario VMs gives the same child"""
+        scenario = DataGenerator.generate_scenario('small', seed=8)
+        vms = scenario['vms']
+        template = scenario['server_template']
+        rng = random.Random(8)
+        parents = [first_fit_solution(rng.sample(vms, len(vms)), template) for _ in range(2)]
+
+        random.seed(2)
+        expected = simple_crossover(*parents)
+        random.seed(2)
+        child = simple_crossover(*parents, VMArrays.from_vms(vms))
+        assert child.get_vm_assignment() == expected.get_vm_assignment()
+        assert sorted(child.get_vm_assignment()) == sorted(vm.id for vm in vms)
+
+
+class TestPacking:
+    """Test cases for the initial-population packers"""
+
+    def test_compiled_packer_matches_python(self, monkeypatch):
+        """Test that the pack kernel places VMs exactly like the Python packer"""
+        scenario = DataGenerator.generate_scenario('medium', seed=4)
+        vms = random.Random(4).sample(scenario['vms'], len(scenario['vms']))
+        template = scenario['server_template']
+
+        demand, capacity = demand_matrix(vms), capacity_vector(template)
+        monkeypatch.setattr(vectorized, 'HAS_NUMBA', False)
+        for mode in (engine.FIRST_FIT, engine.BEST_FIT, engine.WORST_FIT):
+            assignment, num_servers = pack(demand, capacity, mode)
+            assert (assignment.tolist(), num_servers) == pack_vms(vms, template, mode)
+
+    def test_best_and_worst_fit_choice(self):
+        """Test that Best-Fit picks the fullest and Worst-Fit the emptiest server"""
+        template = Server(id=0, max_cpu_cores=10, max_ram_gb=100, max_storage_gb=1000)
+        vms = [VirtualMachine(id=1, cpu_cores=6, ram_gb=1, storage_gb=1),
+               VirtualMachine(id=2, cpu_cores=5, ram_gb=1, storage_gb=1),
+               VirtualMachine(id=3, cpu_cores=3, ram_gb=1, storage_gb=1),
+               VirtualMachine(id=4, cpu_cores=11, ram_gb=1, storage_gb=1)]
+        # VM 3 fits both servers: 4 cores left on server 0, 5 on server 1
+        assert pack_vms(vms, template, engine.BEST_FIT) == ([0, 1, 0, -1], 2)
+        assert pack_vms(vms, template, engine.WORST_FIT) == ([0, 1, 1, -1], 2)
+
+        solution = engine._create_solution_best_fit(vms, template)
+        assert [[vm.id for vm in s.vms] for s in solution.servers] == [[1, 3], [2]]
+        assert solution.servers[0].used_cpu == 9
+
+    def test_best_fit_perfect_fit(self, monkeypatch):
+        """Test that Best-Fit takes the first server a VM fills exactly"""
+        template = Server(id=0, max_cpu_cores=10, max_ram_gb=10, max_storage_gb=10)
+        capacity = capacity_vector(template)
+        # Servers 0 and 1 both have exactly 4 left, so the 4 fills either:
+        # the earlier one wins. Then the 3 fills server 2 exactly, ahead of
+        # server 1 with 4 left.
+        cases = [([6, 6, 4], [0, 1, 0]), ([6, 6, 4, 7, 3], [0, 1, 0, 2, 2])]
+        for sizes, expected in cases:
+            vms = [VirtualMachine(id=i, cpu_cores=c, ram_gb=c, storage_gb=c)
+                   for i, c in enumerate(sizes)]
+            num_servers = max(expected) + 1
+            assignment, count = pack(demand_matrix(vms), capacity, engine.BEST_FIT)
+            assert (assignment.tolist(), count) == (expected, num_servers)
+            monkeypatch.setattr(vectorized, 'HAS_NUMBA', False)
+            assert pack_vms(vms, template, engine.BEST_FIT) == (expected, num_servers)
+            monkeypatch.undo()
+
+    def test_simple_first_fit_solution(self):
+        """Test that simple_engine's First-Fit matches packing with Server.add_vm"""
+        scenario = DataGenerator.generate_scenario('medium', seed=10)
+        template = scenario['server_template']
+        vms = random.Random(10).sample(scenario['vms'], len(scenario['vms']))
+
+        expected = []
+        for vm in vms:
+            for server in expected:
+                if server.add_vm(vm):
+                    break
+            else:
+                expected.append(Server(id=len(expected), max_cpu_cores=template.max_cpu_cores,
+                                       max_ram_gb=template.max_ram_gb,
+                                       max_storage_gb=template.max_storage_gb, vms=[vm]))
+
+        solution = first_fit_solution(vms, template)
+        assert ([[vm.id for vm in s.vms] for s in solution.servers] ==
+                [[vm.id for vm in s.vms] for s in expected])
+
+    def test_threaded_initial_population(self):
+        """Test that packing on threads builds the same population"""
+        scenario = DataGenerator.generate_scenario('small', seed=9)
+        layouts = []
+        for n_workers in (None, 3):
+            random.seed(9)
+            population = create_initial_population(scenario['vms'], scenario['server_template'],
+                                                   12, n_workers=n_workers)
+            layouts.append([[[vm.id for vm in s.vms] for s in sol.servers] for sol in population])
+        assert layouts[0] == layouts[1]
+
+
+class TestDiversity:
+    """Test cases for the population diversity measure"""
+
+    def test_hamming_distance(self):
+        """Test identical and partially different populations"""
+        vms = [VirtualMachine(id=i, cpu_cores=1, ram_gb=1, storage_gb=1) for i in range(4)]
+
+        def solution(layout):
+            return Solution(servers=[
+                Server(id=sid, max_cpu_cores=8, max_ram_gb=8, max_storage_gb=8,
+                       vms=[vms[i] for i in members])
+                for sid, members in layout.items()
+            ])
+
+        same = [solution({0: [0, 1], 1: [2, 3]}) for _ in range(3)]
+        assert _calculate_diversity(same) == 0.0
+
+        # VM 3 moves to server 0 and VM 2 is missing: 2 of 4 VMs differ
+        pair = [solution({0: [0, 1], 1: [2, 3]}), solution({0: [0, 1, 3]})]
+        assert _calculate_diversity(pair) == 0.5